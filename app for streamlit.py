@@ -1,18 +1,47 @@
+import importlib
+import io
+import os
+import threading
 import streamlit as st
-import pandas as pd
 import json
-from load_and_clean import load_and_clean
-from wet_dry_classification import classify_wet_dry
-from spell_analysis import extract_spells
-from rainfall_statistics import rainfall_intensity_stats
-from synthetic_rainfall_generator import generate_synthetic
-from harvest_summary import compute_harvest, summarize_harvest
-from reference_table_builder import build_reliability_table
-from export_results import export_results_to_json
 
 st.set_page_config(page_title="MCS – Rainwater Harvesting Decision Support Tool", layout="wide")
 st.title("MCS – Rainwater Harvesting Decision Support Tool")
 
+# pandas/numpy and the pipeline are imported where they are first needed;
+# a background thread loads them while the page renders, so by the time a
+# CSV is uploaded those imports are already done.
+PIPELINE_MODULES = (
+    "pandas",
+    "load_and_clean",
+    "stage_cache",
+    "pipeline_runner",
+    "reference_table_builder",
+    "export_results",
+)
+
+
+def _preload():
+    for name in PIPELINE_MODULES:
+        importlib.import_module(name)
+
+
+@st.cache_resource
+def start_preload():
+    # Once per server process, not once per rerun
+    thread = threading.Thread(target=_preload, name="mcs-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def get_stage_cache():
+    # Shared across reruns and sessions; set MCS_CACHE_DIR to also keep
+    # stage results on disk (pickled, so only point it at a trusted directory).
+    from stage_cache import StageCache
+
+    return StageCache(cache_dir=os.environ.get("MCS_CACHE_DIR"))
+
 # --- File Upload ---
 st.header("1. Upload Raw Rainfall CSV")
 uploaded_file = st.file_uploader("Choose a CSV file", type=["csv"])
@@ -26,10 +55,28 @@ studs = col3.number_input("Students / classroom", value=40, step=1)
 demand = col4.number_input("Demand (L / student / day)", value=5.0)
 
 run_analysis = st.button("3. Compute Harvest & Tank Reliability")
+capture_profile = st.checkbox("Capture profile", value=False)
+
+start_preload()
 
 if uploaded_file is not None:
+    from load_and_clean import load_and_clean
+    from stage_cache import data_hash
+    from pipeline_runner import PipelineRunner
+
+    cache = get_stage_cache()
+    loader = PipelineRunner()
     try:
-        raw_df = load_and_clean(uploaded_file)
+        data_key, raw_df = cache.stage(
+            "load_and_clean",
+            None,
+            data_hash(uploaded_file.getvalue()),
+            lambda: loader.stage("load_and_clean", load_and_clean, uploaded_file),
+        )
+        # Loading usually happens on the rerun before "Compute", so keep
+        # its timing for that run's metrics.
+        if loader.metrics:
+            st.session_state["load_metrics"] = (data_key, loader.metrics)
         st.success("Rainfall data loaded successfully.")
     except Exception as e:
         st.error(f"File Error: {e}")
@@ -38,24 +85,58 @@ else:
     raw_df = None
 
 if run_analysis and raw_df is not None:
+    import pstats
+    import pandas as pd
+    from wet_dry_classification import classify_wet_dry
+    from spell_analysis import extract_spells
+    from rainfall_statistics import rainfall_intensity_stats
+    from synthetic_rainfall_generator import generate_synthetic
+    from harvest_summary import compute_harvest, summarize_harvest
+    from reference_table_builder import build_reliability_table
+    from pipeline_runner import PipelineRunner
+
     with st.spinner("Running analysis..."):
+        runner = PipelineRunner(trace_memory=capture_profile, profile=capture_profile)
+        load_key, load_metrics = st.session_state.get("load_metrics", (None, []))
+        if load_key == data_key:
+            runner.metrics.extend(load_metrics)
+
+        def cached_stage(name, parent_key, params, fn, *args, **kwargs):
+            # Only stages that miss the cache run (and are timed)
+            return cache.stage(
+                name, parent_key, params, lambda: runner.stage(name, fn, *args, **kwargs)
+            )
+
         try:
             # Synthetic Rainfall
-            hist = classify_wet_dry(raw_df)
-            spells = extract_spells(hist)
-            intensity = rainfall_intensity_stats(hist)
-            synth = generate_synthetic(spells, intensity)
+            hist_key, hist = cached_stage(
+                "classify_wet_dry", data_key, {}, classify_wet_dry, raw_df
+            )
+            _, spells = cached_stage(
+                "extract_spells", hist_key, {}, extract_spells, hist
+            )
+            _, intensity = cached_stage(
+                "rainfall_intensity_stats", hist_key, {}, rainfall_intensity_stats, hist
+            )
+            synth_key, synth = cached_stage(
+                "generate_synthetic", hist_key, {}, generate_synthetic, spells, intensity
+            )
 
             # Harvest
-            harvest_df = compute_harvest(
-                synth,
-                roof_area=roof,
-                classrooms=cls,
-                runoff_coeff=0.9,
-                gutter_eff=0.95,
-                first_flush=2.0,
+            harvest_params = {
+                "roof_area": roof,
+                "classrooms": cls,
+                "runoff_coeff": 0.9,
+                "gutter_eff": 0.95,
+                "first_flush": 2.0,
+            }
+            harvest_key, harvest_df = cached_stage(
+                "compute_harvest", synth_key, harvest_params,
+                compute_harvest, synth, **harvest_params,
+            )
+            _, harvest = cached_stage(
+                "summarize_harvest", harvest_key, {}, summarize_harvest, harvest_df
             )
-            harvest = summarize_harvest(harvest_df)
 
             # Display Harvest
             st.subheader("Harvest Potential")
@@ -86,10 +167,13 @@ if run_analysis and raw_df is not None:
 
             # Tank Reliability
             daily_demand = cls * studs * demand
-            table = build_reliability_table(
-                harvest_df,
-                tank_sizes=range(500, 30001, 500),
-                daily_demand_L=daily_demand,
+            reliability_params = {
+                "tank_sizes": range(500, 30001, 500),
+                "daily_demand_L": daily_demand,
+            }
+            _, table = cached_stage(
+                "build_reliability_table", harvest_key, reliability_params,
+                build_reliability_table, harvest_df, **reliability_params,
             )
             st.subheader("Tank Reliability (Top 20)")
             st.dataframe(table.head(20))
@@ -98,14 +182,29 @@ if run_analysis and raw_df is not None:
             st.session_state["harvest_df"] = harvest_df
             st.session_state["harvest_summary"] = harvest
             st.session_state["reliability_table"] = table
+            st.session_state["stage_metrics"] = runner.metrics
         except Exception as e:
             st.error(f"Processing Error: {e}")
+        finally:
+            runner.close()
+
+        with st.expander("Stage timings"):
+            if runner.metrics:
+                st.dataframe(runner.metrics_table())
+            else:
+                st.write("All stages were served from the cache.")
+            if runner.profiler and runner.profiler.getstats():
+                profile_text = io.StringIO()
+                pstats.Stats(runner.profiler, stream=profile_text).sort_stats("cumulative").print_stats(30)
+                st.text(profile_text.getvalue())
 
 if (
     "harvest_df" in st.session_state and
     "harvest_summary" in st.session_state and
     "reliability_table" in st.session_state
 ):
+    from export_results import build_results_payload
+
     metadata = {
         "roof_area_per_class_m2": roof,
         "number_of_classrooms": cls,
@@ -113,15 +212,24 @@ if (
         "demand_L_per_student_per_day": demand,
         "simulation_years": int(st.session_state["harvest_df"]["synthetic_year"].nunique()),
     }
-    # Prepare JSON data
-    json_data = json.dumps({
-        "metadata": metadata,
-        "harvest_summary": st.session_state["harvest_summary"],
-        "reliability_table": st.session_state["reliability_table"].to_dict(),
-    }, indent=2)
+    # Same layout as the JSON file written by export_results_to_json
+    compact = st.checkbox("Compact JSON (columnar, no indentation)")
+    payload = build_results_payload(
+        metadata,
+        st.session_state["harvest_summary"],
+        st.session_state["reliability_table"],
+        layout="columnar" if compact else "records",
+    )
+    json_data = json.dumps(payload, separators=(",", ":")) if compact else json.dumps(payload, indent=2)
     st.download_button(
         label="Download Results as JSON",
         data=json_data,
         file_name="rainwater_results.json",
         mime="application/json"
     )
+    st.download_button(
+        label="Download Stage Metrics as JSON",
+        data=json.dumps({"stages": st.session_state.get("stage_metrics", [])}, indent=2),
+        file_name="rainwater_results_metrics.json",
+        mime="application/json"
+    )
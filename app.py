@@ -1,16 +1,84 @@
-import threading
+import time
 
-from load_and_clean import load_and_clean
-from wet_dry_classification import classify_wet_dry
-from spell_analysis import extract_spells
-from rainfall_statistics import rainfall_intensity_stats
-from synthetic_rainfall_generator import generate_synthetic
-from harvest_summary import compute_harvest, summarize_harvest
-from reference_table_builder import build_reliability_table
-from export_results import export_results_to_json
-from export_results import export_results_to_json
+_STARTED = time.perf_counter()
 
+import importlib
+import json
+import os
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
 
+from background_jobs import JobRunner
+
+# pandas/numpy and the pipeline are imported on first use, or earlier by
+# the warm-up job queued once the window is up, so startup only pays for Tk.
+PIPELINE_MODULES = ("load_and_clean", "pipeline_runner", "export_results")
+
+
+def _preload_task(job):
+    for name in PIPELINE_MODULES:
+        job.check_cancelled()
+        importlib.import_module(name)
+
+
+def _pipeline_task(job, raw_df, params, profile=False, load_metrics=()):
+    """Runs on a worker thread; reports to the UI only through ``job``."""
+    from pipeline_runner import PipelineRunner, STAGES, run_pipeline
+    from export_results import export_results_to_json
+
+    stages = STAGES[1:]  # load_and_clean ran at upload
+
+    def on_stage_start(name):
+        job.check_cancelled()
+        job.progress(0.9 * stages.index(name) / len(stages), f"Running {name}...")
+
+    def on_stage_end(record, result):
+        if record["stage"] == "summarize_harvest":
+            job.partial(("harvest", result))
+
+    def on_reliability(days_done, days_total, table):
+        job.check_cancelled()
+        job.progress(
+            0.9 * (len(stages) - 1 + days_done / days_total) / len(stages),
+            f"Simulating tanks ({days_done:,} of {days_total:,} days)...",
+        )
+        job.partial(("reliability", table))
+
+    runner = PipelineRunner(on_stage_start, on_stage_end, trace_memory=profile, profile=profile)
+    runner.metrics.extend(load_metrics)
+    try:
+        result = run_pipeline(
+            raw_df,
+            roof_area=params["roof"],
+            classrooms=params["cls"],
+            students=params["studs"],
+            demand=params["demand"],
+            runner=runner,
+            on_reliability=on_reliability,
+        )
+    finally:
+        runner.close()
+
+    # ---- EXPORT TO JSON ----
+    job.progress(0.95, "Exporting results...")
+    metadata = {
+        "roof_area_per_class_m2": params["roof"],
+        "number_of_classrooms": params["cls"],
+        "students_per_class": params["studs"],
+        "demand_L_per_student_per_day": params["demand"],
+        "simulation_years": int(result["harvest_df"]["synthetic_year"].nunique()),
+    }
+
+    result["json_path"] = export_results_to_json(
+        output_path=".",
+        metadata=metadata,
+        harvest_summary=result["harvest"],
+        reliability_table=result["table"],
+    )
+    result["runner"] = runner
+    runner.write_metrics(result["json_path"])
+
+    return result
 
 
 class MCSApp(tk.Tk):
@@ -35,6 +103,8 @@ class MCSApp(tk.Tk):
             return
 
         try:
+            from export_results import export_results_to_json
+
             metadata = {
                 "roof_area_per_class_m2": self.roof.get(),
                 "number_of_classrooms": self.cls.get(),
@@ -51,6 +121,8 @@ class MCSApp(tk.Tk):
                 harvest_summary=self.harvest_summary,
                 reliability_table=self.reliability_table,
             )
+            if self.runner is not None:
+                self.runner.write_metrics(path)
 
             messagebox.showinfo(
                 "Export Successful",
@@ -71,7 +143,27 @@ class MCSApp(tk.Tk):
         self.reliability_table = None
         self.harvest_df = None
         self.raw_df = None
+        self.load_metrics = []
+        self.runner = None
+        self.jobs = JobRunner()
+        self.job = None
+        self.preload = None
+        self.startup_seconds = None
         self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(100, self._poll_jobs)
+        self.after_idle(self._on_first_window)
+
+    def _on_first_window(self):
+        # First idle callback: the window has been drawn
+        self.startup_seconds = time.perf_counter() - _STARTED
+        self.preload = self.jobs.submit(_preload_task)
+        self.status_var.set("Loading analysis modules...")
+
+        # Used by benchmark.py --startup
+        if os.environ.get("MCS_STARTUP_PROBE"):
+            print(json.dumps({"first_window_seconds": self.startup_seconds}), flush=True)
+            self._on_close()
 
     def _build_ui(self):
         # ================= ROOT CONTAINER =================
@@ -117,11 +209,34 @@ class MCSApp(tk.Tk):
             ttk.Entry(grid, textvariable=var, width=10).grid(row=r, column=1, pady=2)
 
         # ================= RUN BUTTON =================
-        ttk.Button(
-            root,
+        run = ttk.Frame(root)
+        run.pack(pady=8)
+
+        self.run_btn = ttk.Button(
+            run,
             text="3. Compute Harvest & Tank Reliability",
             command=self.run_pipeline
-        ).pack(pady=8)
+        )
+        self.run_btn.pack(side=tk.LEFT, padx=4)
+
+        self.cancel_btn = ttk.Button(
+            run,
+            text="Cancel",
+            command=self.cancel_pipeline,
+            state=tk.DISABLED
+        )
+        self.cancel_btn.pack(side=tk.LEFT, padx=4)
+
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            run, text="Capture profile", variable=self.profile_var
+        ).pack(side=tk.LEFT, padx=4)
+
+        self.progress = ttk.Progressbar(root, mode="determinate", maximum=1.0)
+        self.progress.pack(fill=tk.X, padx=6)
+
+        self.status_var = tk.StringVar()
+        ttk.Label(root, textvariable=self.status_var).pack(anchor="w", padx=6)
 
         
         self.export_btn = ttk.Button(
@@ -151,7 +266,13 @@ class MCSApp(tk.Tk):
         if not path:
             return
         try:
-            self.raw_df = load_and_clean(path)
+            from load_and_clean import load_and_clean
+            from pipeline_runner import PipelineRunner
+
+            # Timed here and merged into the next run's metrics
+            loader = PipelineRunner()
+            self.raw_df = loader.stage("load_and_clean", load_and_clean, path)
+            self.load_metrics = loader.metrics
             self.path_var.set(path)
             messagebox.showinfo("Loaded", "Rainfall data loaded successfully.")
         except Exception as e:
@@ -162,92 +283,124 @@ class MCSApp(tk.Tk):
         if self.raw_df is None:
             messagebox.showwarning("Missing Data", "Please upload a CSV first.")
             return
+        if self.job is not None:
+            return
+
+        # Tk variables are read here, on the UI thread, never by the worker
+        params = {
+            "roof": self.roof.get(),
+            "cls": self.cls.get(),
+            "studs": self.studs.get(),
+            "demand": self.demand.get(),
+        }
+
+        self.output.delete("1.0", tk.END)
+        self.export_btn.config(state=tk.DISABLED)
+        self.run_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.progress["value"] = 0
+
+        self.job = self.jobs.submit(
+            _pipeline_task, self.raw_df, params, self.profile_var.get(), self.load_metrics
+        )
+
+    def cancel_pipeline(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.status_var.set("Cancelling...")
+
+    def _poll_jobs(self):
+        for job, kind, payload in self.jobs.poll():
+            if job is self.preload:
+                if kind == "error":
+                    self.status_var.set(f"Could not load analysis modules: {payload}")
+                    messagebox.showerror("Startup Error", f"Could not load analysis modules:\n{payload}")
+                elif kind == "done" and self.job is None:
+                    self.status_var.set("Ready.")
+                continue
+            if job is not self.job:
+                continue
+
+            if kind == "progress":
+                fraction, message = payload
+                self.progress["value"] = fraction
+                self.status_var.set(message)
+            elif kind == "partial":
+                self._show_partial(*payload)
+            elif kind == "done":
+                self._show_results(payload)
+                self._finish_job("Analysis complete.")
+            elif kind == "error":
+                self._finish_job("Analysis failed.")
+                messagebox.showerror("Processing Error", str(payload))
+            elif kind == "cancelled":
+                self._finish_job("Analysis cancelled.")
+
+        self.after(100, self._poll_jobs)
+
+    def _finish_job(self, status):
+        self.job = None
+        self.status_var.set(status)
+        self.run_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+
+    def _show_partial(self, kind, data):
+        if kind == "harvest":
+            # ---- DISPLAY HARVEST FIRST ----
+            self.output.insert(tk.END, "HARVEST POTENTIAL\n")
+            self.output.insert(
+                tk.END,
+                f"Annual Harvest: {data['annual_L']:,.0f} L / year\n\n"
+            )
+
+            self.output.insert(tk.END, "Monthly Harvest (L):\n")
+            for m, v in data["monthly_L"].items():
+                self.output.insert(tk.END, f"  Month {m}: {v:,.0f}\n")
+
+            # Reliability rows are redrawn below this mark as they arrive
+            self.output.mark_set("reliability", tk.END)
+            self.output.mark_gravity("reliability", tk.LEFT)
+
+        elif kind == "reliability":
+            self.output.delete("reliability", tk.END)
+            self.output.insert(tk.END, "\nTANK RELIABILITY (Top 20, in progress)\n")
+            self.output.insert(tk.END, data.head(20).to_string(index=False))
+
+    def _show_results(self, result):
+        self.output.delete("reliability", tk.END)
+        self.output.insert(
+            tk.END,
+            f"\n\nJSON results exported to:\n{result['json_path']}\n"
+        )
+
+        self.output.insert(tk.END, "\nTANK RELIABILITY (Top 20)\n")
+        self.output.insert(
+            tk.END,
+            result["table"].head(20).to_string(index=False)
+        )
+
+        self.output.insert(tk.END, "\n\nSTAGE TIMINGS\n")
+        self.output.insert(
+            tk.END,
+            result["runner"].metrics_table().to_string(
+                index=False, float_format="{:.3f}".format
+            )
+        )
+
+        # ---- STORE RESULTS FOR EXPORT ----
+        self.harvest_df = result["harvest_df"]
+        self.harvest_summary = result["harvest"]
+        self.reliability_table = result["table"]
+        self.runner = result["runner"]
+
+        # Enable export button
+        self.export_btn.config(state=tk.NORMAL)
 
-        def task():
-            try:
-                self.output.delete("1.0", tk.END)
-
-                # ---- Synthetic Rainfall ----
-                hist = classify_wet_dry(self.raw_df)
-                spells = extract_spells(hist)
-                intensity = rainfall_intensity_stats(hist)
-                synth = generate_synthetic(spells, intensity)
-
-                # ---- Harvest ----
-                harvest_df = compute_harvest(
-                    synth,
-                    roof_area=self.roof.get(),
-                    classrooms=self.cls.get(),
-                    runoff_coeff=0.9,
-                    gutter_eff=0.95,
-                    first_flush=2.0,
-                )
-
-                harvest = summarize_harvest(harvest_df)
-
-                # ---- DISPLAY HARVEST FIRST ----
-                self.output.insert(tk.END, "HARVEST POTENTIAL\n")
-                self.output.insert(
-                    tk.END,
-                    f"Annual Harvest: {harvest['annual_L']:,.0f} L / year\n\n"
-                )
-
-                self.output.insert(tk.END, "Monthly Harvest (L):\n")
-                for m, v in harvest["monthly_L"].items():
-                    self.output.insert(tk.END, f"  Month {m}: {v:,.0f}\n")
-
-                # ---- Tank Reliability ----
-                daily_demand = (
-                    self.cls.get() * self.studs.get() * self.demand.get()
-                )
-
-                table = build_reliability_table(
-                    harvest_df,
-                    tank_sizes=range(500, 30001, 500),
-                    daily_demand_L=daily_demand,
-                )
-                
-                # ---- EXPORT TO JSON ----
-                metadata = {
-                    "roof_area_per_class_m2": self.roof.get(),
-                    "number_of_classrooms": self.cls.get(),
-                    "students_per_class": self.studs.get(),
-                    "demand_L_per_student_per_day": self.demand.get(),
-                    "simulation_years": int(harvest_df["synthetic_year"].nunique()),
-                }
-
-                json_path = export_results_to_json(
-                    output_path=".",
-                    metadata=metadata,
-                    harvest_summary=harvest,
-                    reliability_table=table,
-                )
-
-                self.output.insert(
-                    tk.END,
-                    f"\n\nJSON results exported to:\n{json_path}\n"
-                )
-
-
-                self.output.insert(tk.END, "\nTANK RELIABILITY (Top 20)\n")
-                self.output.insert(
-                    tk.END,
-                    table.head(20).to_string(index=False)
-                )
-                
-                # ---- STORE RESULTS FOR EXPORT ----
-                self.harvest_df = harvest_df
-                self.harvest_summary = harvest
-                self.reliability_table = table
-
-                # Enable export button
-                self.export_btn.config(state=tk.NORMAL)
-
-
-            except Exception as e:
-                messagebox.showerror("Processing Error", str(e))
-
-        threading.Thread(target=task, daemon=True).start()
+    def _on_close(self):
+        # Cancels the running pipeline too; the process exits once its
+        # current stage returns
+        self.jobs.shutdown()
+        self.destroy()
 
 
 if __name__ == "__main__":
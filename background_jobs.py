@@ -0,0 +1,101 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """
+    Handle passed to a running task.
+
+    The task reports back with ``progress()`` / ``partial()`` and calls
+    ``check_cancelled()`` between steps; both are safe to use from the
+    worker thread because they only touch the runner's queue.
+    """
+
+    def __init__(self, job_id, events):
+        self.id = job_id
+        self._events = events
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, fraction, message=""):
+        self._events.put((self, "progress", (fraction, message)))
+
+    def partial(self, payload):
+        self._events.put((self, "partial", payload))
+
+
+class JobRunner:
+    """
+    Runs tasks on a worker pool and queues their events for the UI thread.
+
+    A task is called as ``task(job, *args)``. The UI drains events with
+    ``poll()`` (e.g. from Tk's ``after()``); every job ends with exactly one
+    "done", "error" or "cancelled" event.
+    """
+
+    def __init__(self, max_workers=1):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcs-job")
+        self._events = queue.Queue()
+        self._ids = itertools.count(1)
+        # Submitted jobs that have not finished yet
+        self._jobs = set()
+        self._lock = threading.Lock()
+
+    def submit(self, task, *args):
+        job = Job(next(self._ids), self._events)
+        with self._lock:
+            self._jobs.add(job)
+        self._pool.submit(self._run, job, task, args)
+        return job
+
+    def _run(self, job, task, args):
+        try:
+            job.check_cancelled()
+            result = task(job, *args)
+        except JobCancelled:
+            self._events.put((job, "cancelled", None))
+        except Exception as e:
+            self._events.put((job, "error", e))
+        else:
+            self._events.put((job, "done", result))
+        finally:
+            with self._lock:
+                self._jobs.discard(job)
+
+    def poll(self):
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def shutdown(self):
+        """
+        Cancel every unfinished job and stop the pool without waiting.
+
+        A running task only stops at its next ``check_cancelled()``, and
+        the interpreter joins worker threads on exit, so exiting still
+        waits for the current stage of a running job to finish.
+        """
+        with self._lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            job.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
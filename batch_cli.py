@@ -0,0 +1,283 @@
+"""
+Headless batch run over many rain gauge stations.
+
+    python batch_cli.py gauges/ --schools schools.csv --output results/ --workers 64
+    python batch_cli.py stations.txt --schools schools.csv --output results/
+
+The input is a directory of station CSVs or a manifest file listing one
+CSV path per line (relative paths are resolved against the manifest).
+The schools table has one row per school with columns roof_area,
+classrooms, students and demand, plus an optional school name.
+
+Stations are spread over a process pool. Each worker runs the full
+pipeline for one station and writes ``<output>/<station>/<school>.json``
+with export_results_to_json (school names reduced to letters, digits,
+"-" and "_"), then a checkpoint file. Re-running the same
+command skips stations whose checkpoint matches the input file, schools
+table and settings, so an interrupted run resumes where it stopped.
+Failed stations are reported and retried on the next run.
+
+``--spell-model`` generates each station's synthetic rainfall from a
+SpellModel fitted to its own record. ``--validate`` implies it: a station
+whose synthetic series fails validation_report's checks against its
+record is counted as failed and not exported. Validation needs at least
+MIN_VALIDATION_YEARS synthetic years.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from load_and_clean import load_and_clean
+from wet_dry_classification import classify_wet_dry
+from spell_analysis import extract_spell_runs, extract_spells
+from rainfall_statistics import rainfall_intensity_stats
+from synthetic_rainfall_generator import generate_synthetic
+from spell_model import SpellModel
+from batch_schools import SCHOOL_COLUMNS, evaluate_schools
+from export_results import export_results_to_json
+from validation_and_summary import MIN_VALIDATION_YEARS, validation_report
+from stage_cache import data_hash
+
+TANK_SIZES = range(500, 30001, 500)
+
+
+def find_stations(source):
+    """``{station: csv_path}`` from a directory of CSVs or a manifest file."""
+    source = Path(source)
+    if source.is_dir():
+        paths = sorted(source.glob("*.csv"))
+    else:
+        with open(source, encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+        paths = [source.parent / line for line in lines if line and not line.startswith("#")]
+
+    stations = {}
+    for path in paths:
+        if path.stem in stations:
+            raise ValueError(f"Duplicate station name: {path.stem}")
+        stations[path.stem] = path
+    if not stations:
+        raise ValueError(f"No station CSVs found in {source}")
+    return stations
+
+
+def _file_name(school):
+    # Keep letters, digits, "-" and "_"; anything else (e.g. "/") becomes "_"
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", school).strip("_")
+
+
+def load_schools(path):
+    schools = pd.read_csv(path)
+    schools.columns = [c.lower().strip() for c in schools.columns]
+    missing = [c for c in SCHOOL_COLUMNS if c not in schools.columns]
+    if missing:
+        raise ValueError(f"Missing school columns: {missing}")
+    if "school" not in schools.columns:
+        schools["school"] = [f"school_{i + 1}" for i in range(len(schools))]
+    schools["school"] = schools["school"].astype(str)
+    if schools["school"].duplicated().any():
+        raise ValueError("School names must be unique.")
+
+    # Checked here so a bad name fails before any station is simulated
+    schools["output_name"] = schools["school"].map(_file_name)
+    if (schools["output_name"] == "").any():
+        raise ValueError("School names need at least one letter or digit.")
+    clashes = schools.loc[schools["output_name"].duplicated(keep=False), "school"].tolist()
+    if clashes:
+        raise ValueError(f"School names map to the same output file: {clashes}")
+    return schools
+
+
+def station_key(csv_path, schools, settings):
+    # File size and mtime stand in for the CSV contents so that resuming
+    # does not re-read every finished station.
+    stat = os.stat(csv_path)
+    return data_hash(stat.st_size, stat.st_mtime_ns, schools, settings)
+
+
+def _checkpoint_path(output_dir, station):
+    return Path(output_dir) / "checkpoints" / f"{station}.json"
+
+
+def is_done(output_dir, station, key):
+    try:
+        with open(_checkpoint_path(output_dir, station), encoding="utf-8") as f:
+            return json.load(f)["key"] == key
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def run_station(station, csv_path, schools, settings, output_dir, key):
+    """Full pipeline for one station; runs in a worker process."""
+    start = time.perf_counter()
+
+    hist = classify_wet_dry(load_and_clean(csv_path))
+    intensity = rainfall_intensity_stats(hist)
+    if settings["spell_model"]:
+        synth = generate_synthetic(
+            None,
+            intensity,
+            n_years=settings["n_years"],
+            seed=settings["seed"],
+            model=SpellModel.fit(extract_spell_runs(hist)),
+        )
+    else:
+        synth = generate_synthetic(
+            extract_spells(hist),
+            intensity,
+            n_years=settings["n_years"],
+            seed=settings["seed"],
+            vectorized=settings["vectorized"],
+        )
+    validation = None
+    if settings["validate"]:
+        report = validation_report(hist, synth)
+        validation = report["checks"]
+        if not report["passed"]:
+            failed = [name for name, c in validation.items() if not c["passed"]]
+            raise ValueError(f"Synthetic series failed validation: {', '.join(failed)}")
+    result = evaluate_schools(synth, schools, TANK_SIZES)
+
+    station_dir = Path(output_dir) / station
+    station_dir.mkdir(parents=True, exist_ok=True)
+    outputs = []
+    for row, summary in zip(schools.itertuples(index=False), result["harvest_summaries"]):
+        metadata = {
+            "station": station,
+            "school": row.school,
+            "roof_area_per_class_m2": row.roof_area,
+            "number_of_classrooms": row.classrooms,
+            "students_per_class": row.students,
+            "demand_L_per_student_per_day": row.demand,
+            "simulation_years": settings["n_years"],
+        }
+        table = result["reliability"]
+        table = table.loc[table["school"] == row.school, ["tank_L", "reliability_pct"]]
+        outputs.append(export_results_to_json(
+            output_path=station_dir / f"{row.output_name}.json",
+            metadata=metadata,
+            harvest_summary=summary,
+            reliability_table=table.reset_index(drop=True),
+        ))
+
+    # Written last and atomically: a checkpoint means every output exists.
+    checkpoint = _checkpoint_path(output_dir, station)
+    checkpoint.parent.mkdir(parents=True, exist_ok=True)
+    tmp = checkpoint.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "key": key,
+            "csv": str(csv_path),
+            "outputs": outputs,
+            "validation": validation,
+            "seconds": time.perf_counter() - start,
+        }, f, indent=2)
+    os.replace(tmp, checkpoint)
+    return station
+
+
+def run_batch(
+    source,
+    schools_path,
+    output_dir,
+    workers=None,
+    n_years=1,
+    seed=2025,
+    vectorized=False,
+    validate=False,
+    spell_model=False,
+):
+    """Process every pending station; returns ``(done, skipped, failed)``."""
+    if validate and n_years < MIN_VALIDATION_YEARS:
+        raise ValueError(f"--validate needs at least {MIN_VALIDATION_YEARS} synthetic years (--years).")
+
+    stations = find_stations(source)
+    schools = load_schools(schools_path)
+    settings = {
+        "n_years": n_years,
+        "seed": seed,
+        "vectorized": vectorized,
+        "validate": validate,
+        "spell_model": spell_model or validate,
+    }
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    pending, skipped = [], []
+    for station, path in stations.items():
+        key = station_key(path, schools, settings)
+        if is_done(output_dir, station, key):
+            skipped.append(station)
+        else:
+            pending.append((station, path, key))
+
+    # Longest records first so a few large stations do not finish last
+    pending.sort(key=lambda item: os.path.getsize(item[1]), reverse=True)
+    print(f"{len(stations)} stations: {len(pending)} to run, {len(skipped)} already done")
+
+    done, failed = [], {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(run_station, station, path, schools, settings, output_dir, key): station
+                for station, path, key in pending
+            }
+            for future in as_completed(futures):
+                station = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed[station] = str(e)
+                    print(f"[{len(done) + len(failed)}/{len(pending)}] {station}: FAILED ({e})")
+                else:
+                    done.append(station)
+                    print(f"[{len(done) + len(failed)}/{len(pending)}] {station}: done")
+
+    return done, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="directory of station CSVs or a manifest file")
+    parser.add_argument("--schools", required=True, help="CSV with one row per school")
+    parser.add_argument("--output", required=True, help="results directory")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--years", type=int, default=1, help="synthetic years per station")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--vectorized", action="store_true",
+                        help="use the vectorized synthetic generator")
+    parser.add_argument("--spell-model", action="store_true",
+                        help="generate from a spell model fitted to each station's record")
+    parser.add_argument("--validate", action="store_true",
+                        help="fail stations whose synthetic series fails validation "
+                             "(implies --spell-model)")
+    args = parser.parse_args(argv)
+
+    try:
+        done, skipped, failed = run_batch(
+            args.source,
+            args.schools,
+            args.output,
+            workers=args.workers,
+            n_years=args.years,
+            seed=args.seed,
+            vectorized=args.vectorized,
+            validate=args.validate,
+            spell_model=args.spell_model,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"Finished: {len(done)} run, {len(skipped)} skipped, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from harvest_summary import compute_harvest, summarize_harvest
+from reference_table_builder import simulate_tanks
+
+SCHOOL_COLUMNS = ["roof_area", "classrooms", "students", "demand"]
+
+
+def _scale_summary(unit, roof_area, classrooms):
+    # Harvest is linear in roof area x classrooms; per-class values only
+    # scale with the roof area of one classroom.
+    scale = {"": roof_area * classrooms, "_per_class": roof_area}
+    summary = {}
+    for suffix, factor in scale.items():
+        summary[f"annual_L{suffix}"] = unit["annual_L"] * factor
+        for period in ("monthly", "weekly"):
+            summary[f"{period}_L{suffix}"] = {
+                k: v * factor for k, v in unit[f"{period}_L"].items()
+            }
+    return summary
+
+
+def evaluate_schools(
+    synth,
+    schools,
+    tank_sizes,
+    runoff_coeff=0.9,
+    gutter_eff=0.95,
+    first_flush=2.0,
+    chunk_days=3650,
+):
+    """
+    Evaluate harvest and tank reliability for many schools on one rainfall series.
+
+    Parameters
+    ----------
+    synth : pandas.DataFrame
+        Synthetic rainfall from generate_synthetic, shared by every school
+    schools : pandas.DataFrame
+        One row per school with columns roof_area (m² per classroom),
+        classrooms, students (per classroom) and demand (L / student / day)
+    tank_sizes : iterable of int
+        Tank capacities (L)
+    runoff_coeff, gutter_eff, first_flush
+        Harvest parameters passed to compute_harvest
+    chunk_days : int
+        Days of harvest materialized at once for all schools
+
+    Returns
+    -------
+    dict
+        "schools": the input rows plus daily_demand_L, annual_L and
+        annual_L_per_class; "harvest_summaries": one summarize_harvest dict
+        per school; "reliability": long table of school, tank_L and
+        reliability_pct
+    """
+    missing = [c for c in SCHOOL_COLUMNS if c not in schools.columns]
+    if missing:
+        raise ValueError(f"Missing school columns: {missing}")
+    if synth.empty:
+        raise ValueError("No rainfall data available.")
+
+    tank_sizes = list(tank_sizes)
+    roof = schools["roof_area"].to_numpy(dtype=float)
+    cls = schools["classrooms"].to_numpy(dtype=float)
+    daily_demand = cls * schools["students"].to_numpy(dtype=float) * schools["demand"].to_numpy(dtype=float)
+
+    # One unit-roof harvest gives every school's summary by scaling.
+    unit = summarize_harvest(compute_harvest(
+        synth,
+        roof_area=1,
+        classrooms=1,
+        runoff_coeff=runoff_coeff,
+        gutter_eff=gutter_eff,
+        first_flush=first_flush,
+    ))
+    summaries = [_scale_summary(unit, r, c) for r, c in zip(roof, cls)]
+
+    # Tank inflow uses the same operation order as compute_harvest so each
+    # school's reliability matches a single-school run exactly.
+    excess = (synth["rain_mm"].to_numpy(dtype=float) - first_flush).clip(min=0)
+    storage = None
+    shortage = np.zeros((len(schools), len(tank_sizes)), dtype=np.int64)
+    for start in range(0, len(excess), chunk_days):
+        inflow = (
+            excess[start:start + chunk_days, None]
+            * roof * cls
+            * runoff_coeff * gutter_eff
+        )
+        storage, short = simulate_tanks(
+            inflow[:, :, None], tank_sizes, daily_demand[:, None], storage=storage
+        )
+        shortage += short
+
+    n = len(excess)
+    labels = schools["school"].tolist() if "school" in schools.columns else schools.index.tolist()
+    reliability = pd.DataFrame({
+        "school": np.repeat(labels, len(tank_sizes)),
+        "tank_L": tank_sizes * len(schools),
+        "reliability_pct": [round(100 * (1 - s / n), 2) for s in shortage.ravel().tolist()],
+    })
+
+    table = schools.copy()
+    table["daily_demand_L"] = daily_demand
+    table["annual_L"] = [s["annual_L"] for s in summaries]
+    table["annual_L_per_class"] = [s["annual_L_per_class"] for s in summaries]
+
+    return {
+        "schools": table,
+        "harvest_summaries": summaries,
+        "reliability": reliability,
+    }
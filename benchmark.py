@@ -0,0 +1,270 @@
+"""
+Time every pipeline stage on generated gauge records of increasing length.
+
+    python benchmark.py --years 1 10 50 200 --stations 2 --output report.json
+    python benchmark.py --years 10 --compare report.json
+    python benchmark.py --years 1 --startup --output report.json
+
+Each run writes synthetic daily rainfall CSVs, pushes them through the
+full pipeline and records wall time and row counts per stage. Stages are
+timed without tracemalloc; ``--memory`` re-runs each stage under it to
+record peak traced memory as well. With ``--compare`` the report is
+checked against an earlier one made with the same settings and the exit
+status is 1 if any stage slowed down beyond ``--tolerance``.
+``--startup`` also times the desktop front end's cold start (module
+import and time to first window) in fresh interpreters.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from load_and_clean import load_and_clean
+from wet_dry_classification import classify_wet_dry
+from spell_analysis import extract_spells
+from rainfall_statistics import rainfall_intensity_stats
+from synthetic_rainfall_generator import generate_synthetic
+from harvest_summary import compute_harvest, summarize_harvest
+from reference_table_builder import build_reliability_table
+from export_results import export_results_to_json
+
+TANK_SIZES = range(500, 30001, 500)
+
+# Report fields that must match for two reports to be compared
+SETTINGS = ("synthetic_years", "track_memory")
+
+
+def make_station_csv(path, years, seed):
+    """Write a daily gauge record of ``years`` years with gamma-distributed wet days."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1900-01-01", periods=int(round(years * 365.25)), freq="D")
+    wet = rng.random(len(dates)) < 0.35
+    rain = np.where(wet, rng.gamma(0.8, 12.0, len(dates)), 0.0).round(1)
+    pd.DataFrame({"Date": dates.strftime("%Y-%m-%d"), "Rainfall": rain}).to_csv(path, index=False)
+
+
+def _rows(value):
+    return len(value) if isinstance(value, (pd.DataFrame, list)) else None
+
+
+def time_stage(records, name, fn, *args, rows_in=None, track_memory=False, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    seconds = time.perf_counter() - start
+
+    # tracemalloc slows pure-Python code, so memory gets its own pass
+    peak = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            fn(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    records.append({
+        "stage": name,
+        "seconds": seconds,
+        "peak_mb": None if peak is None else peak / 2**20,
+        "rows_in": rows_in,
+        "rows_out": _rows(result),
+    })
+    return result
+
+
+def run_pipeline(csv_path, out_dir, synthetic_years=1, track_memory=False):
+    records = []
+
+    def stage(name, fn, *args, rows_in=None, **kwargs):
+        return time_stage(records, name, fn, *args, rows_in=rows_in, track_memory=track_memory, **kwargs)
+
+    raw = stage("load_and_clean", load_and_clean, csv_path)
+    hist = stage("classify_wet_dry", classify_wet_dry, raw, rows_in=len(raw))
+    spells = stage("extract_spells", extract_spells, hist, rows_in=len(hist))
+    intensity = stage("rainfall_intensity_stats", rainfall_intensity_stats, hist, rows_in=len(hist))
+    synth = stage("generate_synthetic", generate_synthetic, spells, intensity, n_years=synthetic_years)
+    harvest_df = stage(
+        "compute_harvest", compute_harvest, synth, rows_in=len(synth),
+        roof_area=63.0, classrooms=4, runoff_coeff=0.9, gutter_eff=0.95, first_flush=2.0,
+    )
+    harvest = stage("summarize_harvest", summarize_harvest, harvest_df, rows_in=len(harvest_df))
+    table = stage(
+        "build_reliability_table", build_reliability_table, harvest_df, rows_in=len(harvest_df),
+        tank_sizes=TANK_SIZES, daily_demand_L=4 * 40 * 5.0,
+    )
+    metadata = {"simulation_years": synthetic_years}
+    stage(
+        "export_results_to_json", export_results_to_json, rows_in=len(table),
+        output_path=str(Path(out_dir) / "results.json"),
+        metadata=metadata, harvest_summary=harvest, reliability_table=table,
+    )
+    return records
+
+
+def run_benchmark(years, stations=1, synthetic_years=1, repeat=1, track_memory=False):
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_years in years:
+            for station in range(stations):
+                csv_path = Path(tmp) / f"station_{station}_{n_years}y.csv"
+                make_station_csv(csv_path, n_years, seed=station)
+                for attempt in range(repeat):
+                    runs.append({
+                        "station": station,
+                        "years": n_years,
+                        "repeat": attempt,
+                        "stages": run_pipeline(csv_path, tmp, synthetic_years, track_memory),
+                    })
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "synthetic_years": synthetic_years,
+        "track_memory": track_memory,
+        "runs": runs,
+    }
+
+
+def measure_startup(repeat=3):
+    """
+    Median cold-start times of app.py, each run in a fresh interpreter.
+
+    "import_seconds" is the wall time of ``python -c "import app"``.
+    "first_window_seconds" is reported by the app itself when started with
+    MCS_STARTUP_PROBE set; it is None when no display is available.
+    """
+    app_dir = Path(__file__).resolve().parent
+    imports, windows = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import app"], cwd=app_dir, check=True)
+        imports.append(time.perf_counter() - start)
+
+        probe = subprocess.run(
+            [sys.executable, "app.py"],
+            cwd=app_dir,
+            env={**os.environ, "MCS_STARTUP_PROBE": "1"},
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        lines = probe.stdout.strip().splitlines()
+        if probe.returncode == 0 and lines:
+            windows.append(json.loads(lines[-1])["first_window_seconds"])
+
+    return {
+        "import_seconds": statistics.median(imports),
+        "first_window_seconds": statistics.median(windows) if windows else None,
+    }
+
+
+def compare_startup(report, baseline, tolerance):
+    """Startup measures that are slower than ``baseline`` by more than ``tolerance``."""
+    current, previous = report.get("startup") or {}, baseline.get("startup") or {}
+    slower = []
+    for name, seconds in current.items():
+        if seconds and previous.get(name) and seconds / previous[name] > 1 + tolerance:
+            slower.append({"measure": name, "ratio": seconds / previous[name]})
+    return slower
+
+
+def stage_medians(report):
+    """Median seconds per (years, stage) across stations and repeats."""
+    rows = [
+        {"years": run["years"], "stage": s["stage"], "seconds": s["seconds"]}
+        for run in report["runs"] for s in run["stages"]
+    ]
+    return pd.DataFrame(rows).groupby(["years", "stage"], sort=False)["seconds"].median()
+
+
+def compare_reports(report, baseline, tolerance):
+    """Return the (years, stage) entries that are slower than ``baseline`` by more than ``tolerance``."""
+    differing = [name for name in SETTINGS if report.get(name) != baseline.get(name)]
+    if differing:
+        raise ValueError(f"Reports were made with different settings: {', '.join(differing)}")
+    current, previous = stage_medians(report), stage_medians(baseline)
+    common = current.index.intersection(previous.index)
+    ratio = current[common] / previous[common]
+    slower = ratio[ratio > 1 + tolerance]
+    return [
+        {"years": y, "stage": s, "ratio": float(r)}
+        for (y, s), r in slower.items()
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=float, nargs="+", default=[1, 10, 50],
+                        help="record lengths (years) to generate")
+    parser.add_argument("--stations", type=int, default=1, help="stations per record length")
+    parser.add_argument("--synthetic-years", type=int, default=1,
+                        help="n_years passed to generate_synthetic")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per station")
+    parser.add_argument("--memory", action="store_true",
+                        help="also record peak traced memory, in a second run of each stage")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="earlier report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against --compare (0.25 = 25%%)")
+    parser.add_argument("--startup", action="store_true",
+                        help="also time the desktop app's cold start")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        args.years,
+        stations=args.stations,
+        synthetic_years=args.synthetic_years,
+        repeat=args.repeat,
+        track_memory=args.memory,
+    )
+
+    print(stage_medians(report).unstack(0).to_string(float_format="{:.4f}".format), file=sys.stderr)
+
+    if args.startup:
+        report["startup"] = measure_startup(max(args.repeat, 3))
+        for name, seconds in report["startup"].items():
+            shown = "n/a (no display)" if seconds is None else f"{seconds:.3f} s"
+            print(f"startup {name}: {shown}", file=sys.stderr)
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare_reports(report, baseline, args.tolerance)
+        except ValueError as e:
+            parser.error(str(e))
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"REGRESSION {r['stage']} ({r['years']:g} y): {r['ratio']:.2f}x", file=sys.stderr)
+        startup_regressions = compare_startup(report, baseline, args.tolerance)
+        report["startup_regressions"] = startup_regressions
+        for r in startup_regressions:
+            print(f"REGRESSION startup {r['measure']}: {r['ratio']:.2f}x", file=sys.stderr)
+        status = 1 if regressions or startup_regressions else 0
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import numpy as np
+
+from synthetic_rainfall_generator import DAYS_PER_YEAR
+
+WEEKDAYS = (0, 1, 2, 3, 4)  # Monday-Friday
+
+
+def _calendar(df, first_weekday):
+    # Day of year and weekday (Monday = 0) for every row: from the dates of
+    # an observed record, or counted from ``first_weekday`` through the
+    # 365-day years of a synthetic series.
+    if "date" in df.columns:
+        return (
+            df["date"].dt.dayofyear.to_numpy(dtype=np.int64),
+            df["date"].dt.dayofweek.to_numpy(dtype=np.int64),
+        )
+    day = df["day_of_year"].to_numpy(dtype=np.int64)
+    position = (df["synthetic_year"].to_numpy(dtype=np.int64) - 1) * DAYS_PER_YEAR + day - 1
+    return day, (first_weekday + position) % 7
+
+
+def school_days(
+    df,
+    terms=None,
+    holidays=(),
+    weekdays=WEEKDAYS,
+    first_weekday=0,
+):
+    """
+    Boolean mask of school days for every row of a rainfall/harvest frame.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Synthetic series (synthetic_year, day_of_year) or observed record (date)
+    terms : list of (int, int), optional
+        Inclusive (first, last) day-of-year ranges of each school term;
+        the whole year when omitted. Days outside every term are breaks.
+    holidays : iterable of int
+        Days of year with no school
+    weekdays : iterable of int
+        Weekdays with school (Monday = 0)
+    first_weekday : int
+        Weekday of day 1 of synthetic year 1
+    """
+    day, weekday = _calendar(df, first_weekday)
+
+    mask = np.isin(weekday, list(weekdays))
+    if terms is not None:
+        in_term = np.zeros(len(day), dtype=bool)
+        for first, last in terms:
+            in_term |= (day >= first) & (day <= last)
+        mask &= in_term
+    mask &= ~np.isin(day, list(holidays))
+    return mask
+
+
+def school_demand(
+    df,
+    daily_demand_L,
+    terms=None,
+    holidays=(),
+    weekdays=WEEKDAYS,
+    first_weekday=0,
+    off_day_fraction=0.0,
+):
+    """
+    Per-day demand schedule (L) for build_reliability_table.
+
+    School days use ``daily_demand_L``; weekends, holidays and term breaks
+    use ``off_day_fraction`` of it (e.g. for staff or cleaning).
+    """
+    mask = school_days(df, terms, holidays, weekdays, first_weekday)
+    return np.where(mask, daily_demand_L, daily_demand_L * off_day_fraction)
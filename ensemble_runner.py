@@ -0,0 +1,185 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from synthetic_rainfall_generator import generate_synthetic
+from harvest_summary import compute_harvest, summarize_harvest
+from reference_table_builder import build_reliability_table
+from validation_and_summary import MIN_VALIDATION_YEARS, validation_report
+
+SUMMARY_SCALARS = ["annual_L", "annual_L_per_class"]
+SUMMARY_TABLES = ["monthly_L", "monthly_L_per_class", "weekly_L", "weekly_L_per_class"]
+
+# Inputs shared by every member, set once per worker process.
+_shared = {}
+
+
+def _init_worker(spells, intensity, model, settings, hist=None):
+    _shared["spells"] = spells
+    _shared["intensity"] = intensity
+    _shared["model"] = model
+    _shared["settings"] = settings
+    _shared["hist"] = hist
+
+
+def _run_member(seed):
+    s = _shared["settings"]
+
+    synth = generate_synthetic(
+        _shared["spells"],
+        _shared["intensity"],
+        n_years=s["n_years"],
+        seed=seed,
+        vectorized=True,
+        model=_shared["model"],
+    )
+    harvest_df = compute_harvest(
+        synth,
+        roof_area=s["roof_area"],
+        classrooms=s["classrooms"],
+        runoff_coeff=s["runoff_coeff"],
+        gutter_eff=s["gutter_eff"],
+        first_flush=s["first_flush"],
+    )
+    table = build_reliability_table(
+        harvest_df,
+        tank_sizes=s["tank_sizes"],
+        daily_demand_L=s["daily_demand_L"],
+    )
+
+    validation = None
+    if _shared["hist"] is not None:
+        report = validation_report(_shared["hist"], synth)
+        validation = {name: c["value"] for name, c in report["checks"].items()}
+        validation["passed"] = report["passed"]
+
+    return summarize_harvest(harvest_df), table["reliability_pct"].to_numpy(), validation
+
+
+def _summary_bands(summaries, percentiles):
+    bands = {f"p{p:g}": {} for p in percentiles}
+
+    for key in SUMMARY_SCALARS:
+        values = np.percentile([s[key] for s in summaries], percentiles)
+        for p, v in zip(percentiles, values):
+            bands[f"p{p:g}"][key] = float(v)
+
+    for key in SUMMARY_TABLES:
+        members = pd.DataFrame([s[key] for s in summaries]).fillna(0.0)
+        values = np.percentile(members.to_numpy(), percentiles, axis=0)
+        for p, row in zip(percentiles, values):
+            bands[f"p{p:g}"][key] = dict(zip(members.columns.tolist(), row.tolist()))
+
+    return bands
+
+
+def run_ensemble(
+    spells,
+    intensity,
+    roof_area,
+    classrooms,
+    daily_demand_L,
+    tank_sizes,
+    n_members=100,
+    root_seed=2025,
+    n_years=1,
+    runoff_coeff=0.9,
+    gutter_eff=0.95,
+    first_flush=2.0,
+    percentiles=(5, 50, 95),
+    max_workers=None,
+    model=None,
+    hist=None,
+):
+    """
+    Run independent synthetic realizations and reduce them to percentile bands.
+
+    Member seeds are spawned from ``numpy.random.SeedSequence(root_seed)``,
+    so results depend only on the root seed, never on the number of workers.
+
+    Parameters
+    ----------
+    spells, intensity
+        Outputs of extract_spells and rainfall_intensity_stats
+    roof_area, classrooms, runoff_coeff, gutter_eff, first_flush
+        Harvest parameters passed to compute_harvest
+    daily_demand_L : float
+        Daily demand (L)
+    tank_sizes : iterable of int
+        Tank capacities (L)
+    n_members : int
+        Number of realizations
+    root_seed : int
+        Seed from which member seeds are spawned
+    n_years : int
+        Synthetic years per realization
+    percentiles : sequence of float
+        Percentiles reported for every output
+    max_workers : int, optional
+        Worker processes; 1 runs every member in the current process
+    model : spell_model.SpellModel, optional
+        Fitted spell model used by generate_synthetic
+    hist : pandas.DataFrame, optional
+        Historical record from classify_wet_dry; when given, every member's
+        synthetic series is checked with validation_report. Needs ``model``
+        and at least MIN_VALIDATION_YEARS ``n_years``.
+
+    Returns
+    -------
+    dict
+        "harvest_summary": summarize_harvest-shaped dict per percentile
+        (keyed "p5", "p50", ...), "reliability_table": DataFrame with tank_L
+        and one reliability column per percentile, "n_members": n_members;
+        with ``hist``, also "validation": one row of check values and a
+        passed flag per member
+    """
+    if hist is not None:
+        # The fixed 40%/1-5 day generator cannot match a real record
+        if model is None:
+            raise ValueError("Validating an ensemble needs a fitted spell model (model=SpellModel.fit(...)).")
+        if n_years < MIN_VALIDATION_YEARS:
+            raise ValueError(f"Validating an ensemble needs n_years >= {MIN_VALIDATION_YEARS}.")
+
+    tank_sizes = list(tank_sizes)
+    settings = {
+        "n_years": n_years,
+        "roof_area": roof_area,
+        "classrooms": classrooms,
+        "runoff_coeff": runoff_coeff,
+        "gutter_eff": gutter_eff,
+        "first_flush": first_flush,
+        "tank_sizes": tank_sizes,
+        "daily_demand_L": daily_demand_L,
+    }
+    seeds = np.random.SeedSequence(root_seed).spawn(n_members)
+
+    if max_workers == 1:
+        _init_worker(spells, intensity, model, settings, hist)
+        results = [_run_member(seed) for seed in seeds]
+    else:
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(spells, intensity, model, settings, hist),
+        ) as pool:
+            chunksize = max(1, n_members // (4 * workers))
+            results = list(pool.map(_run_member, seeds, chunksize=chunksize))
+
+    summaries = [r[0] for r in results]
+    reliability = np.vstack([r[1] for r in results])
+
+    table = pd.DataFrame({"tank_L": tank_sizes})
+    for p, row in zip(percentiles, np.percentile(reliability, percentiles, axis=0)):
+        table[f"reliability_p{p:g}"] = np.round(row, 2)
+
+    result = {
+        "harvest_summary": _summary_bands(summaries, percentiles),
+        "reliability_table": table,
+        "n_members": n_members,
+    }
+    if hist is not None:
+        result["validation"] = pd.DataFrame([r[2] for r in results])
+    return result
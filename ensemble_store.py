@@ -0,0 +1,173 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from synthetic_rainfall_generator import DAYS_PER_YEAR, generate_synthetic
+from reference_table_builder import simulate_tanks
+
+COLUMNS = {
+    "day_of_year": np.int16,
+    "month": np.int8,
+    "rain_mm": np.float32,
+    "harvest_L": np.float64,
+}
+
+
+class EnsembleStore:
+    """
+    Long synthetic ensembles kept on disk as memory-mapped columns.
+
+    A store is a directory with one raw file per column (int16 day_of_year,
+    int8 month, float32 rain_mm, float64 harvest_L) plus a meta.json.
+    Stages read it through ``iter_chunks()``, which yields views of the
+    mapped files, so peak memory depends on the chunk size, not on the
+    number of years.
+
+    rain_mm is rounded to float32. harvest_L is kept in float64 so that
+    ``reliability_table()`` matches build_reliability_table run on the
+    stored rainfall exactly.
+    """
+
+    def __init__(self, path, meta, mode="r"):
+        self.path = Path(path)
+        self.meta = meta
+        self.mode = mode
+        self.n_days = meta["n_years"] * DAYS_PER_YEAR
+
+    @classmethod
+    def create(cls, path, n_years):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        meta = {"n_years": n_years, "columns": [], "harvest_params": None}
+        store = cls(path, meta, mode="r+")
+        store._write_meta()
+        return store
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        with open(Path(path) / "meta.json", encoding="utf-8") as f:
+            return cls(path, json.load(f), mode=mode)
+
+    def _write_meta(self):
+        with open(self.path / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def column(self, name, mode=None):
+        """Memory-mapped array for one column (created on first write)."""
+        file = self.path / f"{name}.bin"
+        if mode is None:
+            if file.exists():
+                mode = self.mode
+            elif self.mode == "r":
+                raise FileNotFoundError(f"Column {name} has not been written to {self.path}.")
+            else:
+                mode = "w+"
+        return np.memmap(file, dtype=COLUMNS[name], mode=mode, shape=(self.n_days,))
+
+    def _added(self, *names):
+        self.meta["columns"] = sorted(set(self.meta["columns"]) | set(names))
+        self._write_meta()
+
+    def write_synthetic(self, intensity, seed=2025, years_per_chunk=1000, model=None):
+        """
+        Generate all years with the vectorized generator, a chunk of years
+        at a time. One generator stream spans the chunks, so a seed (with the
+        same ``years_per_chunk``) always reproduces the same store.
+        """
+        rng = np.random.default_rng(seed)
+        columns = {name: self.column(name, mode="w+") for name in ("day_of_year", "month", "rain_mm")}
+
+        for first in range(0, self.meta["n_years"], years_per_chunk):
+            n_years = min(years_per_chunk, self.meta["n_years"] - first)
+            # Passing the Generator as the seed continues its stream
+            synth = generate_synthetic(None, intensity, n_years, seed=rng, vectorized=True, model=model)
+            days = slice(first * DAYS_PER_YEAR, (first + n_years) * DAYS_PER_YEAR)
+            for name, out in columns.items():
+                out[days] = synth[name].to_numpy()
+
+        for out in columns.values():
+            out.flush()
+        self._added(*columns)
+
+    def compute_harvest(
+        self,
+        roof_area,
+        classrooms,
+        runoff_coeff,
+        gutter_eff,
+        first_flush,
+        chunk_days=1_000_000,
+    ):
+        """Chunked compute_harvest writing the harvest_L column."""
+        harvest = self.column("harvest_L", mode="w+")
+        for start, chunk in self.iter_chunks(["rain_mm"], chunk_days):
+            rain = chunk["rain_mm"].astype(float)
+            harvest[start:start + len(rain)] = (
+                (rain - first_flush).clip(min=0)
+                * roof_area * classrooms
+                * runoff_coeff * gutter_eff
+            )
+        harvest.flush()
+
+        self.meta["harvest_params"] = {
+            "roof_area": roof_area,
+            "classrooms": classrooms,
+            "runoff_coeff": runoff_coeff,
+            "gutter_eff": gutter_eff,
+            "first_flush": first_flush,
+        }
+        self._added("harvest_L")
+
+    def _require_harvest(self):
+        if self.meta["harvest_params"] is None:
+            raise ValueError("No harvest in the store; run compute_harvest first.")
+
+    def iter_chunks(self, columns, chunk_days=1_000_000):
+        """Yield ``(start_day, {column: view})`` over the whole ensemble."""
+        arrays = {name: self.column(name, mode="r") for name in columns}
+        for start in range(0, self.n_days, chunk_days):
+            yield start, {name: a[start:start + chunk_days] for name, a in arrays.items()}
+
+    def reliability_table(self, tank_sizes, daily_demand_L, chunk_days=1_000_000):
+        """build_reliability_table over the stored harvest, chunk by chunk."""
+        self._require_harvest()
+        tank_sizes = list(tank_sizes)
+        storage = None
+        shortage = np.zeros(len(tank_sizes), dtype=np.int64)
+        for _, chunk in self.iter_chunks(["harvest_L"], chunk_days):
+            storage, short = simulate_tanks(
+                chunk["harvest_L"], tank_sizes, daily_demand_L, storage=storage
+            )
+            shortage += short
+
+        return pd.DataFrame({
+            "tank_L": tank_sizes,
+            "reliability_pct": [round(100 * (1 - s / self.n_days), 2) for s in shortage.tolist()],
+        })
+
+    def summarize_harvest(self, chunk_days=1_000_000):
+        """summarize_harvest over the stored harvest, chunk by chunk."""
+        self._require_harvest()
+        classrooms = self.meta["harvest_params"]["classrooms"]
+        years = self.meta["n_years"]
+        monthly = np.zeros(13)
+        weekly = np.zeros(54)
+
+        for _, chunk in self.iter_chunks(["harvest_L", "month", "day_of_year"], chunk_days):
+            harvest = chunk["harvest_L"].astype(float)
+            monthly += np.bincount(chunk["month"], weights=harvest, minlength=13)
+            week = (chunk["day_of_year"].astype(np.int64) - 1) // 7 + 1
+            weekly += np.bincount(week, weights=harvest, minlength=54)
+
+        summary = {}
+        for suffix, scale in (("", 1), ("_per_class", classrooms)):
+            summary[f"annual_L{suffix}"] = monthly.sum() / scale / years
+            summary[f"monthly_L{suffix}"] = {
+                m: v / scale / years for m, v in enumerate(monthly.tolist()) if m
+            }
+            summary[f"weekly_L{suffix}"] = {
+                w: v / scale / years for w, v in enumerate(weekly.tolist()) if w
+            }
+        return summary
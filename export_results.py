@@ -2,6 +2,74 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+LAYOUTS = ("records", "columnar")
+BINARY_SUFFIXES = (".msgpack", ".mpk")
+
+
+def _series(values, layout):
+    # Monthly/weekly summaries: {"1": v, ...} or {"keys": [...], "values": [...]}
+    if layout == "columnar":
+        return {
+            "keys": [int(k) for k in values],
+            "values": [round(v, 2) for v in values.values()],
+        }
+    return {str(k): round(v, 2) for k, v in values.items()}
+
+
+def _packb(payload):
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("Binary export needs the 'msgpack' package (pip install msgpack).")
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def build_results_payload(
+    metadata: dict,
+    harvest_summary: dict,
+    reliability_table,
+    layout: str = "records",
+):
+    """
+    Results in the layout written by export_results_to_json.
+
+    ``layout="columnar"`` stores the monthly/weekly summaries as parallel
+    key/value lists and the reliability table as one list per column,
+    instead of string-keyed objects and one object per row.
+
+    Parameters
+    ----------
+    metadata : dict
+        Study / school / parameter information
+    harvest_summary : dict
+        Annual, monthly, weekly harvest summaries (PER YEAR)
+    reliability_table : pandas.DataFrame
+        Tank size vs reliability results
+    layout : str
+        "records" (default) or "columnar"
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}; expected one of {LAYOUTS}")
+
+    if layout == "columnar":
+        tank_reliability = {c: reliability_table[c].tolist() for c in reliability_table.columns}
+    else:
+        tank_reliability = reliability_table.to_dict(orient="records")
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "metadata": metadata,
+        "harvest_summary": {
+            "annual_L_per_year": round(harvest_summary["annual_L"], 2),
+            "annual_L_per_year_per_class": round(harvest_summary.get("annual_L_per_class", 0), 2),
+            "monthly_L_per_year": _series(harvest_summary["monthly_L"], layout),
+            "monthly_L_per_year_per_class": _series(harvest_summary.get("monthly_L_per_class", {}), layout),
+            "weekly_L_per_year": _series(harvest_summary["weekly_L"], layout),
+            "weekly_L_per_year_per_class": _series(harvest_summary.get("weekly_L_per_class", {}), layout),
+        },
+        "tank_reliability": tank_reliability,
+    }
+
 
 def export_results_to_json(
     output_path: str,
@@ -29,33 +97,75 @@ def export_results_to_json(
     if output_path.suffix != ".json":
         output_path = output_path / "mcs_rwh_results.json"
 
-    payload = {
-        "generated_at": datetime.now().isoformat(),
-        "metadata": metadata,
-        "harvest_summary": {
-            "annual_L_per_year": round(harvest_summary["annual_L"], 2),
-            "annual_L_per_year_per_class": round(harvest_summary.get("annual_L_per_class", 0), 2),
-            "monthly_L_per_year": {
-                str(k): round(v, 2)
-                for k, v in harvest_summary["monthly_L"].items()
-            },
-            "monthly_L_per_year_per_class": {
-                str(k): round(v, 2)
-                for k, v in harvest_summary.get("monthly_L_per_class", {}).items()
-            },
-            "weekly_L_per_year": {
-                str(k): round(v, 2)
-                for k, v in harvest_summary["weekly_L"].items()
-            },
-            "weekly_L_per_year_per_class": {
-                str(k): round(v, 2)
-                for k, v in harvest_summary.get("weekly_L_per_class", {}).items()
-            },
-        },
-        "tank_reliability": reliability_table.to_dict(orient="records"),
-    }
+    return export_results(output_path, metadata, harvest_summary, reliability_table)
+
+
+def export_results(
+    output_path,
+    metadata: dict,
+    harvest_summary: dict,
+    reliability_table,
+    layout: str = "records",
+    indent=2,
+):
+    """
+    Write one result set as JSON, or as MessagePack for .msgpack/.mpk paths.
+
+    ``layout="columnar"`` with ``indent=None`` gives the compact JSON form.
+    Returns the path written.
+    """
+    output_path = Path(output_path)
+    payload = build_results_payload(metadata, harvest_summary, reliability_table, layout)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+    if output_path.suffix in BINARY_SUFFIXES:
+        data = _packb(payload)
+        with open(output_path, "wb") as f:
+            f.write(data)
+    else:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=indent, separators=None if indent else (",", ":"))
 
     return str(output_path)
+
+
+class ResultsStreamWriter:
+    """
+    Appends many result sets (schools, stations, ensemble members) to one file.
+
+    Each ``write()`` serializes and flushes a single result set, so memory
+    does not grow with the number of results. JSON paths get one compact
+    object per line (NDJSON); .msgpack/.mpk paths get consecutive
+    MessagePack objects, readable with ``msgpack.Unpacker``.
+
+        with ResultsStreamWriter("batch.ndjson") as out:
+            for school in schools:
+                out.write(metadata, harvest_summary, table)
+    """
+
+    def __init__(self, output_path, layout="columnar"):
+        self.output_path = Path(output_path)
+        self.layout = layout
+        self.binary = self.output_path.suffix in BINARY_SUFFIXES
+        if self.binary:
+            _packb(None)  # fail before creating the file if msgpack is missing
+        self.count = 0
+        self._file = open(self.output_path, "wb" if self.binary else "w", encoding=None if self.binary else "utf-8")
+
+    def write(self, metadata, harvest_summary, reliability_table, **extra):
+        payload = build_results_payload(metadata, harvest_summary, reliability_table, self.layout)
+        payload.update(extra)
+        if self.binary:
+            self._file.write(_packb(payload))
+        else:
+            self._file.write(json.dumps(payload, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
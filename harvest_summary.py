@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def compute_harvest(df,
@@ -20,32 +21,52 @@ def compute_harvest(df,
     return df
 
 
-def summarize_harvest(df):
-    years = df["synthetic_year"].nunique()
+def _grouped_sums(keys, values, years):
+    # Sum each value column per key with np.bincount, keeping only keys that
+    # occur (as groupby would), scaled to a per-year figure.
+    counts = np.bincount(keys)
+    present = np.flatnonzero(counts).tolist()
+    return [
+        dict(zip(present, (np.bincount(keys, weights=v, minlength=len(counts))[present] / years).tolist()))
+        for v in values
+    ]
+
+
+def summarize_harvest(df, per_year=False):
+    """
+    Annual, monthly and weekly harvest per simulated year.
+
+    Every summary is computed from precomputed month/week indices with
+    np.bincount, without copying the frame. With ``per_year=True`` the
+    result also has "annual_L_by_year" and "annual_L_per_class_by_year"
+    keyed by synthetic year.
+    """
+    harvest = df["harvest_L"].to_numpy(dtype=float)
+    per_class = df["harvest_L_per_class"].to_numpy(dtype=float)
+    year = df["synthetic_year"].to_numpy()
+    years = len(pd.unique(year))
 
     summary = {}
 
-    summary["annual_L"] = df["harvest_L"].sum() / years
+    summary["annual_L"] = harvest.sum() / years
 
     # Per-classroom summaries
-    summary["annual_L_per_class"] = df["harvest_L_per_class"].sum() / years
+    summary["annual_L_per_class"] = per_class.sum() / years
 
-    monthly = (
-        df.groupby("month")["harvest_L"].sum() / years
+    month = df["month"].to_numpy(dtype=np.int64)
+    summary["monthly_L"], summary["monthly_L_per_class"] = _grouped_sums(
+        month, (harvest, per_class), years
     )
-    summary["monthly_L"] = monthly.to_dict()
 
-    monthly_per_class = (
-        df.groupby("month")["harvest_L_per_class"].sum() / years
+    week = (df["day_of_year"].to_numpy(dtype=np.int64) - 1) // 7 + 1
+    summary["weekly_L"], summary["weekly_L_per_class"] = _grouped_sums(
+        week, (harvest, per_class), years
     )
-    summary["monthly_L_per_class"] = monthly_per_class.to_dict()
-
-    df = df.copy()
-    df["week"] = ((df["day_of_year"] - 1) // 7) + 1
-    weekly = df.groupby("week")["harvest_L"].sum() / years
-    summary["weekly_L"] = weekly.to_dict()
 
-    weekly_per_class = df.groupby("week")["harvest_L_per_class"].sum() / years
-    summary["weekly_L_per_class"] = weekly_per_class.to_dict()
+    if per_year:
+        labels, index = np.unique(year, return_inverse=True)
+        labels = labels.tolist()
+        for key, v in (("annual_L_by_year", harvest), ("annual_L_per_class_by_year", per_class)):
+            summary[key] = dict(zip(labels, np.bincount(index, weights=v).tolist()))
 
     return summary
@@ -0,0 +1,141 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from harvest_summary import compute_harvest
+from reference_table_builder import simulate_tanks
+
+
+class ReliabilityState:
+    """
+    Running tank simulation and harvest totals for an appended gauge record.
+
+    ``update()`` takes newly recorded days (a load_and_clean frame), so
+    appending N days costs O(N x tanks) instead of a full rerun. The state
+    persists to JSON with ``save()``/``load()`` between runs. Days dated on
+    or before the last processed day are ignored, which makes re-feeding an
+    overlapping file safe.
+    """
+
+    def __init__(
+        self,
+        tank_sizes,
+        daily_demand_L,
+        roof_area,
+        classrooms,
+        runoff_coeff=0.9,
+        gutter_eff=0.95,
+        first_flush=2.0,
+    ):
+        self.tank_sizes = list(tank_sizes)
+        self.daily_demand_L = daily_demand_L
+        self.harvest_params = {
+            "roof_area": roof_area,
+            "classrooms": classrooms,
+            "runoff_coeff": runoff_coeff,
+            "gutter_eff": gutter_eff,
+            "first_flush": first_flush,
+        }
+
+        self.storage = np.asarray(self.tank_sizes, dtype=float)
+        self.shortage = np.zeros(len(self.tank_sizes), dtype=np.int64)
+        self.n_days = 0
+        self.last_date = None
+        self.years = set()
+        # Rows: harvest (L), harvest per class (L), days seen;
+        # columns: month 1-12 / week 1-53 (column 0 unused)
+        self.monthly = np.zeros((3, 13))
+        self.weekly = np.zeros((3, 54))
+
+    def update(self, df):
+        """Simulate new days from a load_and_clean frame; returns the number used."""
+        if self.last_date is not None:
+            df = df[df["date"] > self.last_date]
+        if df.empty:
+            return 0
+
+        harvest_df = compute_harvest(
+            df.rename(columns={"rainfall": "rain_mm"}),
+            **self.harvest_params,
+        )
+        inflow = harvest_df["harvest_L"].to_numpy(dtype=float)
+
+        self.storage, short = simulate_tanks(
+            inflow, self.tank_sizes, self.daily_demand_L, storage=self.storage
+        )
+        self.shortage += short
+        self.n_days += len(inflow)
+        self.last_date = df["date"].max()
+        self.years.update(df["date"].dt.year.unique().tolist())
+
+        month = df["month"].to_numpy(dtype=np.int64)
+        week = (df["date"].dt.dayofyear.to_numpy(dtype=np.int64) - 1) // 7 + 1
+        for i, column in enumerate(("harvest_L", "harvest_L_per_class")):
+            values = harvest_df[column].to_numpy(dtype=float)
+            self.monthly[i] += np.bincount(month, weights=values, minlength=13)
+            self.weekly[i] += np.bincount(week, weights=values, minlength=54)
+        self.monthly[2] += np.bincount(month, minlength=13)
+        self.weekly[2] += np.bincount(week, minlength=54)
+
+        return len(inflow)
+
+    def reliability_table(self):
+        if self.n_days == 0:
+            raise ValueError("No harvest data available.")
+
+        return pd.DataFrame({
+            "tank_L": self.tank_sizes,
+            "reliability_pct": [
+                round(100 * (1 - s / self.n_days), 2) for s in self.shortage.tolist()
+            ],
+        })
+
+    def harvest_summary(self):
+        """summarize_harvest-shaped totals per recorded calendar year."""
+        if self.n_days == 0:
+            raise ValueError("No harvest data available.")
+
+        years = len(self.years)
+        summary = {}
+        for i, suffix in enumerate(("", "_per_class")):
+            summary[f"annual_L{suffix}"] = self.monthly[i].sum() / years
+            for period, totals in (("monthly", self.monthly), ("weekly", self.weekly)):
+                seen = np.flatnonzero(totals[2]).tolist()
+                summary[f"{period}_L{suffix}"] = {k: totals[i, k] / years for k in seen}
+        return summary
+
+    def to_dict(self):
+        return {
+            "tank_sizes": self.tank_sizes,
+            "daily_demand_L": self.daily_demand_L,
+            "harvest_params": self.harvest_params,
+            "storage": self.storage.tolist(),
+            "shortage": self.shortage.tolist(),
+            "n_days": self.n_days,
+            "last_date": None if self.last_date is None else self.last_date.isoformat(),
+            "years": sorted(self.years),
+            "monthly": self.monthly.tolist(),
+            "weekly": self.weekly.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data["tank_sizes"], data["daily_demand_L"], **data["harvest_params"])
+        state.storage = np.asarray(data["storage"], dtype=float)
+        state.shortage = np.asarray(data["shortage"], dtype=np.int64)
+        state.n_days = data["n_days"]
+        state.last_date = None if data["last_date"] is None else pd.Timestamp(data["last_date"])
+        state.years = set(data["years"])
+        state.monthly = np.asarray(data["monthly"], dtype=float)
+        state.weekly = np.asarray(data["weekly"], dtype=float)
+        return state
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -1,5 +1,14 @@
+import json
+import os
+
+import numpy as np
 import pandas as pd
 
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    guess_datetime_format = None
+
 RAIN_ALIASES = [
     "rainfall", "rain", "rain_mm", "rr", "precip", "precipitation", "daily_rainfall"
 ]
@@ -8,23 +17,30 @@ DATE_ALIASES = [
     "date", "day", "datetime"
 ]
 
-def load_and_clean(csv_path: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
-    df.columns = [c.lower().strip() for c in df.columns]
 
+def _detect_columns(columns):
     # Detect rainfall column
-    rain_col = next((c for c in df.columns if c in RAIN_ALIASES), None)
+    rain_col = next((c for c in columns if c in RAIN_ALIASES), None)
     if rain_col is None:
-        raise ValueError(f"No rainfall column found. Columns: {list(df.columns)}")
-    # Always create a 'rainfall' column for downstream code
-    if rain_col != "rainfall":
-        df["rainfall"] = df[rain_col]
+        raise ValueError(f"No rainfall column found. Columns: {list(columns)}")
 
     # Detect date column
-    date_col = next((c for c in df.columns if c in DATE_ALIASES or "date" in c), None)
+    date_col = next((c for c in columns if c in DATE_ALIASES or "date" in c), None)
     if date_col is None:
         raise ValueError("No date column found.")
 
+    return rain_col, date_col
+
+
+def load_and_clean(csv_path: str) -> pd.DataFrame:
+    df = pd.read_csv(csv_path)
+    df.columns = [c.lower().strip() for c in df.columns]
+
+    rain_col, date_col = _detect_columns(df.columns)
+    # Always create a 'rainfall' column for downstream code
+    if rain_col != "rainfall":
+        df["rainfall"] = df[rain_col]
+
     df["date"] = pd.to_datetime(df[date_col], errors="coerce")
     if df["date"].isna().any():
         raise ValueError("Invalid date values detected.")
@@ -34,3 +50,119 @@ def load_and_clean(csv_path: str) -> pd.DataFrame:
     df["month"] = df["date"].dt.month
 
     return df[["date", "month", "rainfall"]].sort_values("date").reset_index(drop=True)
+
+
+def load_and_clean_chunked(
+    csv_path,
+    chunksize=1_000_000,
+    date_format=None,
+    cache_path=None,
+) -> pd.DataFrame:
+    """
+    Streaming variant of load_and_clean for rainfall files too large for memory.
+
+    Only the detected date and rainfall columns are read, ``chunksize`` rows
+    at a time. Dates are parsed with ``date_format``, or with a format
+    guessed once from the first date in the file. The result uses compact
+    dtypes (int8 month, float32 rainfall).
+
+    Parameters
+    ----------
+    csv_path : str or file-like
+        Rainfall CSV
+    chunksize : int
+        Rows parsed per chunk
+    date_format : str, optional
+        strftime-style date format; guessed when omitted
+    cache_path : str, optional
+        .npz file holding the cleaned result. It is loaded instead of the
+        CSV when it is newer than the CSV and was written from a CSV of the
+        same size with the same ``chunksize`` and ``date_format``; it is
+        (re)written otherwise.
+    """
+    settings = {"chunksize": chunksize, "date_format": date_format}
+    if cache_path and isinstance(csv_path, (str, os.PathLike)):
+        settings["csv_size"] = os.path.getsize(csv_path)
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(csv_path):
+            try:
+                return load_cleaned(cache_path, settings)
+            except ValueError:
+                pass  # written with other settings; rebuild it
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if hasattr(csv_path, "seek"):
+        csv_path.seek(0)
+    names = {c.lower().strip(): c for c in header}
+    rain_col, date_col = _detect_columns(list(names))
+
+    dates, rain = [], []
+    reader = pd.read_csv(
+        csv_path,
+        usecols=[names[date_col], names[rain_col]],
+        dtype={names[date_col]: str},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        raw_dates = chunk[names[date_col]]
+        if date_format is None and guess_datetime_format is not None:
+            first = raw_dates.dropna()
+            if not first.empty:
+                date_format = guess_datetime_format(first.iloc[0].strip())
+
+        parsed = pd.to_datetime(raw_dates, format=date_format, errors="coerce")
+        if parsed.isna().any():
+            raise ValueError("Invalid date values detected.")
+
+        values = pd.to_numeric(chunk[names[rain_col]], errors="coerce").to_numpy(dtype=np.float32)
+        values[~(values > 0)] = 0.0
+
+        dates.append(parsed.to_numpy(dtype="datetime64[ns]"))
+        rain.append(values)
+
+    if not dates:
+        raise ValueError("No rainfall records found.")
+
+    df = pd.DataFrame({"date": np.concatenate(dates)})
+    df["month"] = df["date"].dt.month.astype(np.int8)
+    df["rainfall"] = np.concatenate(rain)
+    df = df.sort_values("date", kind="stable").reset_index(drop=True)
+
+    if cache_path:
+        save_cleaned(df, cache_path, settings)
+    return df
+
+
+def save_cleaned(df, path, settings=None):
+    """
+    Write a cleaned rainfall frame to a compact .npz file.
+
+    ``settings`` (a JSON-serializable dict) is stored alongside so that
+    load_cleaned can check the file was made the same way.
+    """
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            date=df["date"].to_numpy(dtype="datetime64[ns]").view(np.int64),
+            month=df["month"].to_numpy(dtype=np.int8),
+            rainfall=df["rainfall"].to_numpy(dtype=np.float32),
+            settings=np.array(json.dumps(settings or {}, sort_keys=True)),
+        )
+
+
+def load_cleaned(path, settings=None) -> pd.DataFrame:
+    """
+    Read a frame written by save_cleaned.
+
+    Raises ValueError if ``settings`` is given and differs from the
+    settings stored with the file.
+    """
+    with np.load(path) as data:
+        if settings is not None:
+            stored = json.loads(str(data["settings"])) if "settings" in data.files else None
+            if stored != json.loads(json.dumps(settings)):
+                raise ValueError(f"{path} was written with different settings: {stored}")
+        return pd.DataFrame({
+            "date": data["date"].view("datetime64[ns]"),
+            "month": data["month"],
+            "rainfall": data["rainfall"],
+        })
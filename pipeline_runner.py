@@ -0,0 +1,204 @@
+import cProfile
+import json
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from wet_dry_classification import classify_wet_dry
+from spell_analysis import extract_spells
+from rainfall_statistics import rainfall_intensity_stats
+from synthetic_rainfall_generator import generate_synthetic
+from harvest_summary import compute_harvest, summarize_harvest
+from reference_table_builder import iter_reliability_table
+
+TANK_SIZES = range(500, 30001, 500)
+
+# load_and_clean is run by the front ends (at upload), the rest by run_pipeline
+STAGES = [
+    "load_and_clean",
+    "classify_wet_dry",
+    "extract_spells",
+    "rainfall_intensity_stats",
+    "generate_synthetic",
+    "compute_harvest",
+    "summarize_harvest",
+    "build_reliability_table",
+]
+
+
+# tracemalloc is process-wide: runners that trace share it (e.g. Streamlit
+# sessions) and it is stopped when the last of them closes.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_users = 1
+        elif _tracing_users:
+            _tracing_users += 1
+        else:
+            return False  # traced by someone else; leave it alone
+    return True
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+
+def _rows(value):
+    return len(value) if isinstance(value, (pd.DataFrame, list)) else None
+
+
+class PipelineRunner:
+    """
+    Runs pipeline stages and records per-stage metrics.
+
+    Every stage gets a record with wall time, rows in/out and, with
+    ``trace_memory``, the traced memory delta and peak. Tracing slows the
+    stages several-fold and its peak is process-wide, so it is off by
+    default; the front ends turn it on with profiling. ``on_stage_start(name)``
+    and ``on_stage_end(record, result)`` are called around each stage.
+    ``profile=True`` also captures a cProfile of the stages.
+    """
+
+    def __init__(self, on_stage_start=None, on_stage_end=None, trace_memory=False, profile=False):
+        self.on_stage_start = on_stage_start
+        self.on_stage_end = on_stage_end
+        self.trace_memory = trace_memory
+        self.profiler = cProfile.Profile() if profile else None
+        self.metrics = []
+        self._started_tracing = False
+
+    def stage(self, name, fn, *args, rows_in=None, **kwargs):
+        if self.on_stage_start:
+            self.on_stage_start(name)
+
+        if rows_in is None and args:
+            rows_in = _rows(args[0])
+        if self.trace_memory:
+            if not self._started_tracing:
+                self._started_tracing = _start_tracing()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+
+        if self.profiler:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            if self.profiler:
+                self.profiler.disable()
+
+        record = {"stage": name, "seconds": seconds, "rows_in": rows_in, "rows_out": _rows(result)}
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            record["memory_delta_mb"] = (current - before) / 2**20
+            record["peak_mb"] = (peak - before) / 2**20
+        self.metrics.append(record)
+
+        if self.on_stage_end:
+            self.on_stage_end(record, result)
+        return result
+
+    def close(self):
+        if self._started_tracing:
+            _stop_tracing()
+            self._started_tracing = False
+
+    def metrics_table(self):
+        return pd.DataFrame(self.metrics)
+
+    def write_metrics(self, results_path):
+        """
+        Write ``<name>_metrics.json`` (and ``<name>_profile.prof`` when
+        profiling) next to an exported results file; returns the paths.
+        """
+        results_path = Path(results_path)
+        metrics_path = results_path.with_name(f"{results_path.stem}_metrics.json")
+        with open(metrics_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "total_seconds": sum(r["seconds"] for r in self.metrics),
+                "stages": self.metrics,
+            }, f, indent=2)
+
+        paths = [str(metrics_path)]
+        if self.profiler:
+            profile_path = results_path.with_name(f"{results_path.stem}_profile.prof")
+            self.profiler.dump_stats(str(profile_path))
+            paths.append(str(profile_path))
+        return paths
+
+
+def run_pipeline(
+    raw_df,
+    roof_area,
+    classrooms,
+    students,
+    demand,
+    runner=None,
+    tank_sizes=TANK_SIZES,
+    on_reliability=None,
+):
+    """
+    Run classify -> spells -> intensity -> synth -> harvest -> reliability.
+
+    ``on_reliability(days_done, days_total, table)`` receives the partial
+    reliability table after every simulated chunk. Returns a dict with the
+    intermediate products, "harvest", "table" and the runner's "metrics".
+    """
+    runner = runner or PipelineRunner()
+
+    # ---- Synthetic Rainfall ----
+    hist = runner.stage("classify_wet_dry", classify_wet_dry, raw_df)
+    spells = runner.stage("extract_spells", extract_spells, hist)
+    intensity = runner.stage("rainfall_intensity_stats", rainfall_intensity_stats, hist)
+    synth = runner.stage("generate_synthetic", generate_synthetic, spells, intensity)
+
+    # ---- Harvest ----
+    harvest_df = runner.stage(
+        "compute_harvest",
+        compute_harvest,
+        synth,
+        roof_area=roof_area,
+        classrooms=classrooms,
+        runoff_coeff=0.9,
+        gutter_eff=0.95,
+        first_flush=2.0,
+    )
+    harvest = runner.stage("summarize_harvest", summarize_harvest, harvest_df)
+
+    # ---- Tank Reliability ----
+    def reliability():
+        table = None
+        for days_done, table in iter_reliability_table(
+            harvest_df,
+            tank_sizes=tank_sizes,
+            daily_demand_L=classrooms * students * demand,
+        ):
+            if on_reliability:
+                on_reliability(days_done, len(harvest_df), table)
+        return table
+
+    table = runner.stage("build_reliability_table", reliability, rows_in=len(harvest_df))
+
+    return {
+        "hist": hist,
+        "synth": synth,
+        "harvest_df": harvest_df,
+        "harvest": harvest,
+        "table": table,
+        "metrics": runner.metrics,
+    }
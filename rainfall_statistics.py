@@ -1,16 +1,74 @@
-def rainfall_intensity_stats(df):
-    stats = {}
-    wet = df[df["state"] == "W"]
+import numpy as np
+
+INDEX_COLUMNS = ("mean", "std", "p90")
+PERIODS = {"month": 12, "week": 53, "day_of_year": 366}
+
+
+def _period_keys(df, period):
+    if period == "month":
+        return df["month"].to_numpy(dtype=np.int64)
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period {period!r}; expected one of {list(PERIODS)}")
+    day = df["date"].dt.dayofyear.to_numpy(dtype=np.int64)
+    return (day - 1) // 7 + 1 if period == "week" else day
+
 
-    if wet.empty:
+def intensity_index(df, period="month"):
+    """
+    Wet-day rainfall statistics per period as one array.
+
+    Row ``k`` holds the mean, std (ddof=1) and 90th percentile of wet-day
+    rainfall for period ``k``: month 1-12, week 1-53 or day of year 1-366.
+    Row 0 and periods without wet days are NaN, so a lookup is a plain
+    index. All periods are computed from a single sort of the wet days.
+    """
+    wet = (df["state"] == "W").to_numpy()
+    if not wet.any():
         raise ValueError("No wet days found in dataset.")
 
-    for m in range(1, 13):
-        data = wet[wet["month"] == m]["rainfall"]
-        if not data.empty:
-            stats[m] = {
-                "mean": data.mean(),
-                "std": data.std(),
-                "p90": data.quantile(0.9),
-            }
-    return stats
+    keys = _period_keys(df, period)[wet]
+    rain = df["rainfall"].to_numpy(dtype=float)[wet]
+    n_rows = PERIODS[period] + 1
+
+    count = np.bincount(keys, minlength=n_rows).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(keys, weights=rain, minlength=n_rows) / count
+        sq_dev = np.bincount(keys, weights=(rain - mean[keys]) ** 2, minlength=n_rows)
+        std = np.sqrt(sq_dev / (count - 1))
+    std[count < 2] = np.nan
+
+    # 90th percentile with linear interpolation, read from each group's
+    # slice of the rainfall sorted by (period, value).
+    ordered = rain[np.lexsort((rain, keys))]
+    start = np.concatenate(([0], np.cumsum(count)[:-1])).astype(np.int64)
+    present = count > 0
+    pos = start[present] + 0.9 * (count[present] - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, len(ordered) - 1)
+    p90 = np.full(n_rows, np.nan)
+    p90[present] = ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+    return np.column_stack((mean, std, p90))
+
+
+def index_to_stats(index):
+    return {
+        k: dict(zip(INDEX_COLUMNS, row))
+        for k, row in enumerate(index.tolist())
+        if not np.isnan(row[0])
+    }
+
+
+def save_intensity_index(index, path, period="month"):
+    with open(path, "wb") as f:
+        np.savez(f, index=index, period=period)
+
+
+def load_intensity_index(path):
+    """Return ``(index, period)`` as written by save_intensity_index."""
+    with np.load(path) as data:
+        return data["index"], str(data["period"])
+
+
+def rainfall_intensity_stats(df):
+    return index_to_stats(intensity_index(df))
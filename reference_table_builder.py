@@ -1,36 +1,294 @@
+import itertools
+import math
+
+import numpy as np
 import pandas as pd
 
+
+def simulate_tanks(inflow, tank_sizes, daily_demand_L, storage=None, per_day_demand=False):
+    """
+    Run the daily yield-after-spillage rule for every tank size at once.
+
+    Parameters
+    ----------
+    inflow : array-like
+        Daily harvest (L) with days along the first axis; any further axes
+        (e.g. one column per school) broadcast against ``tank_sizes``
+    tank_sizes : array-like
+        Tank capacities (L)
+    daily_demand_L : float or array-like
+        Daily demand (L), broadcast against ``tank_sizes``
+    storage : array-like, optional
+        Storage (L) at the start of the run; tanks start full by default.
+        Passing the storage returned by a previous call continues that run.
+    per_day_demand : bool
+        If True, ``daily_demand_L`` has days along its first axis (like
+        ``inflow``) and each day's row broadcasts against ``tank_sizes``
+
+    Returns
+    -------
+    storage : numpy.ndarray
+        Storage (L) per tank at the end of the run
+    shortage : numpy.ndarray
+        Number of days per tank on which demand could not be met
+    """
+    inflow = np.asarray(inflow, dtype=float)
+    tanks = np.asarray(tank_sizes, dtype=float)
+    demand = np.asarray(daily_demand_L, dtype=float)
+
+    if per_day_demand:
+        if len(demand) != len(inflow):
+            raise ValueError("Demand schedule and inflow cover different numbers of days.")
+        demand_shape, demands = demand.shape[1:], demand
+    else:
+        demand_shape, demands = demand.shape, itertools.repeat(demand)
+
+    shape = np.broadcast_shapes(tanks.shape, inflow.shape[1:], demand_shape)
+    if storage is None:
+        storage = tanks
+    storage = np.broadcast_to(np.asarray(storage, dtype=float), shape).copy()
+    shortage = np.zeros(shape, dtype=np.int64)
+    short = np.empty(shape, dtype=bool)
+
+    for daily_in, demand in zip(inflow, demands):
+        np.add(storage, daily_in, out=storage)
+        np.minimum(storage, tanks, out=storage)
+
+        # A shortage empties the tank, otherwise the demand is drawn off;
+        # storage - demand is negative exactly when the demand is not met.
+        np.less(storage, demand, out=short)
+        shortage += short
+        np.subtract(storage, demand, out=storage)
+        np.maximum(storage, 0.0, out=storage)
+
+    return storage, shortage
+
+
+def _reliability_pct(inflow, tank_sizes, daily_demand_L):
+    _, shortage = simulate_tanks(inflow, tank_sizes, daily_demand_L)
+    return [round(100 * (1 - short / len(inflow)), 2) for short in shortage.tolist()]
+
+
+def _schedule_reliability_pct(shortage, demand):
+    # With a demand schedule, reliability is the share of days with demand
+    # that were met; days without demand can never fall short.
+    demand_days = np.count_nonzero(np.asarray(demand) > 0, axis=0)
+    demand_days = np.broadcast_to(demand_days, shortage.shape)
+    return [
+        100.0 if days == 0 else round(100 * (1 - short / days), 2)
+        for short, days in zip(shortage.ravel().tolist(), demand_days.ravel().tolist())
+    ]
+
+
 def build_reliability_table(
     df,
     tank_sizes,
     daily_demand_L
 ):
+    """
+    Tank size vs reliability (% of days on which demand was met).
+
+    ``daily_demand_L`` is a single daily demand (L) or a per-day schedule
+    with one value per row of ``df`` (see demand_profiles). With a
+    schedule, reliability counts only days with demand.
+    """
     if df.empty:
         raise ValueError("No harvest data available.")
 
+    tank_sizes = list(tank_sizes)
+    if np.ndim(daily_demand_L) == 1:
+        _, shortage = simulate_tanks(
+            df["harvest_L"].values, tank_sizes, daily_demand_L, per_day_demand=True
+        )
+        reliability = _schedule_reliability_pct(shortage, daily_demand_L)
+    else:
+        reliability = _reliability_pct(df["harvest_L"].values, tank_sizes, daily_demand_L)
+
     results = []
+    for tank, pct in zip(tank_sizes, reliability):
+        results.append({
+            "tank_L": tank,
+            "reliability_pct": pct
+        })
 
-    inflow = df["harvest_L"].values
-    n = len(inflow)
+    return pd.DataFrame(results)
 
-    for tank in tank_sizes:
-        storage = tank
-        shortage = 0
 
-        for daily_in in inflow:
-            storage = min(tank, storage + daily_in)
+def build_profile_reliability_table(df, tank_sizes, profiles):
+    """
+    Reliability of every tank size under several demand schedules at once.
 
-            if storage >= daily_demand_L:
-                storage -= daily_demand_L
-            else:
-                shortage += 1
-                storage = 0
+    ``profiles`` maps a profile name to a per-day demand schedule (one value
+    per row of ``df``). All profiles run against the same inflow in a
+    single batched simulation. Returns a long table of profile, tank_L and
+    reliability_pct.
+    """
+    if df.empty:
+        raise ValueError("No harvest data available.")
 
-        reliability = 100 * (1 - shortage / n)
+    tank_sizes = list(tank_sizes)
+    names = list(profiles)
+    demand = np.column_stack([np.asarray(profiles[n], dtype=float) for n in names])
 
-        results.append({
-            "tank_L": tank,
-            "reliability_pct": round(reliability, 2)
+    _, shortage = simulate_tanks(
+        df["harvest_L"].values, tank_sizes, demand[:, :, None], per_day_demand=True
+    )
+
+    return pd.DataFrame({
+        "profile": np.repeat(names, len(tank_sizes)),
+        "tank_L": tank_sizes * len(names),
+        "reliability_pct": _schedule_reliability_pct(shortage, demand[:, :, None]),
+    })
+
+
+def iter_reliability_table(
+    df,
+    tank_sizes,
+    daily_demand_L,
+    chunk_days=3650,
+):
+    """
+    Build the reliability table progressively, ``chunk_days`` days at a time.
+
+    Yields ``(days_done, table)`` after each chunk, where ``table`` is the
+    reliability over the days simulated so far. The last table is identical
+    to build_reliability_table's.
+    """
+    if df.empty:
+        raise ValueError("No harvest data available.")
+
+    tank_sizes = list(tank_sizes)
+    inflow = df["harvest_L"].values
+    storage = None
+    shortage = np.zeros(len(tank_sizes), dtype=np.int64)
+
+    for start in range(0, len(inflow), chunk_days):
+        chunk = inflow[start:start + chunk_days]
+        storage, short = simulate_tanks(chunk, tank_sizes, daily_demand_L, storage=storage)
+        shortage += short
+
+        n = start + len(chunk)
+        yield n, pd.DataFrame({
+            "tank_L": tank_sizes,
+            "reliability_pct": [round(100 * (1 - s / n), 2) for s in shortage.tolist()],
         })
 
-    return pd.DataFrame(results)
+
+def minimum_tank_for_reliability(
+    df,
+    target_pct,
+    daily_demand_L,
+    step=500,
+    max_tank_L=None,
+    probes=16,
+):
+    """
+    Find the smallest tank (a multiple of ``step``) meeting a target reliability.
+
+    Reliability never decreases as the tank grows, so the answer is found by
+    galloping (step, 2*step, 4*step, ...) to bracket it and then narrowing
+    the bracket with ``probes`` evenly spaced sizes per pass. Each pass is a
+    single batched simulation.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Harvest data with a ``harvest_L`` column
+    target_pct : float
+        Required reliability (%), compared with the rounded table value
+    daily_demand_L : float
+        Daily demand (L)
+    step : int
+        Tank size resolution (L)
+    max_tank_L : int, optional
+        Largest tank considered; defaults to one holding the demand of the
+        whole record, which can never run short
+    probes : int
+        Tank sizes simulated per narrowing pass
+
+    Returns
+    -------
+    int or None
+        Minimum tank size (L), or None if ``max_tank_L`` cannot meet the target
+    """
+    if df.empty:
+        raise ValueError("No harvest data available.")
+
+    inflow = df["harvest_L"].values
+    if max_tank_L is None:
+        max_tank_L = len(inflow) * daily_demand_L + step
+    n_steps = max(1, math.ceil(max_tank_L / step))
+
+    def meets(idx):
+        reliability = _reliability_pct(inflow, idx * step, daily_demand_L)
+        return np.array(reliability) >= target_pct
+
+    # Tank sizes are handled as multiples of step; lo always fails (or is 0)
+    # and hi always meets the target.
+    idx = np.unique(np.minimum(2 ** np.arange(n_steps.bit_length() + 1), n_steps))
+    ok = meets(idx)
+    if not ok.any():
+        return None
+    first = int(np.argmax(ok))
+    lo, hi = (int(idx[first - 1]) if first else 0), int(idx[first])
+
+    while hi - lo > 1:
+        idx = np.unique(np.linspace(lo, hi, probes + 2)[1:-1].round().astype(int))
+        idx = idx[(idx > lo) & (idx < hi)]
+        ok = meets(idx)
+        if ok.any():
+            first = int(np.argmax(ok))
+            hi = int(idx[first])
+            if first:
+                lo = int(idx[first - 1])
+        else:
+            lo = int(idx[-1])
+
+    return hi * step
+
+
+def adaptive_reliability_table(
+    df,
+    daily_demand_L,
+    min_tank_L=500,
+    max_tank_L=30000,
+    step=500,
+    tolerance_pct=1.0,
+    initial_points=9,
+):
+    """
+    Build a reliability table that is only refined where the curve changes.
+
+    Starts from ``initial_points`` evenly spaced tank sizes and keeps adding
+    midpoints between neighbours whose reliability differs by more than
+    ``tolerance_pct``, down to a resolution of ``step``. Flat stretches of the
+    curve (e.g. sizes already at 100%) are never refined. Returns a table in
+    the same layout as build_reliability_table.
+    """
+    if df.empty:
+        raise ValueError("No harvest data available.")
+
+    inflow = df["harvest_L"].values
+    first, last = math.ceil(min_tank_L / step), math.floor(max_tank_L / step)
+    if last < first:
+        raise ValueError("No tank sizes between min_tank_L and max_tank_L.")
+
+    reliability = {}
+    idx = np.unique(np.linspace(first, last, initial_points).round().astype(int))
+
+    while len(idx):
+        for i, pct in zip(idx.tolist(), _reliability_pct(inflow, idx * step, daily_demand_L)):
+            reliability[i] = pct
+
+        known = sorted(reliability)
+        idx = np.array([
+            (a + b) // 2
+            for a, b in zip(known[:-1], known[1:])
+            if b - a > 1 and abs(reliability[b] - reliability[a]) > tolerance_pct
+        ], dtype=int)
+
+    known = sorted(reliability)
+    return pd.DataFrame({
+        "tank_L": [i * step for i in known],
+        "reliability_pct": [reliability[i] for i in known],
+    })
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+from reference_table_builder import simulate_tanks
+
+PARAMETERS = ("roof_area", "runoff_coeff", "gutter_eff", "first_flush")
+
+RUNOFF_COEFFS = (0.8, 0.9, 0.95)
+GUTTER_EFFS = (0.9, 0.95, 1.0)
+FIRST_FLUSHES = (1.0, 2.0, 3.0)
+
+
+def sensitivity_grid(
+    synth,
+    roof_area,
+    classrooms,
+    daily_demand_L,
+    tank_sizes,
+    runoff_coeff=RUNOFF_COEFFS,
+    gutter_eff=GUTTER_EFFS,
+    first_flush=FIRST_FLUSHES,
+    chunk_days=3650,
+):
+    """
+    Harvest and tank reliability for every combination of harvest parameters.
+
+    All grid points share one synthetic rainfall series and one tank
+    simulation: the first-flush excess is computed once per first-flush
+    depth, scaled by every (roof_area, runoff_coeff, gutter_eff) variant
+    and simulated for all variants and tank sizes together, ``chunk_days``
+    days at a time. Each point matches compute_harvest followed by
+    build_reliability_table with the same parameters.
+
+    Parameters
+    ----------
+    synth : pandas.DataFrame
+        Synthetic rainfall from generate_synthetic
+    roof_area : float or sequence of float
+        Roof area per classroom (m²)
+    classrooms : int
+        Number of classrooms
+    daily_demand_L : float
+        Daily demand (L)
+    tank_sizes : iterable of int
+        Tank capacities (L)
+    runoff_coeff, gutter_eff, first_flush : float or sequence of float
+        Values to evaluate for each harvest parameter
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per grid point and tank size with columns roof_area,
+        runoff_coeff, gutter_eff, first_flush, annual_L, tank_L and
+        reliability_pct
+    """
+    if synth.empty:
+        raise ValueError("No rainfall data available.")
+
+    tank_sizes = list(tank_sizes)
+    flush = np.atleast_1d(np.asarray(first_flush, dtype=float))
+    # Variants that only scale the harvest: one flattened axis
+    roof, runoff, gutter = (
+        a.ravel() for a in np.meshgrid(
+            np.atleast_1d(np.asarray(roof_area, dtype=float)),
+            np.atleast_1d(np.asarray(runoff_coeff, dtype=float)),
+            np.atleast_1d(np.asarray(gutter_eff, dtype=float)),
+            indexing="ij",
+        )
+    )
+
+    rain = synth["rain_mm"].to_numpy(dtype=float)
+    storage = None
+    shortage = np.zeros((len(flush), len(roof), len(tank_sizes)), dtype=np.int64)
+    total = np.zeros((len(flush), len(roof)))
+    for start in range(0, len(rain), chunk_days):
+        excess = (rain[start:start + chunk_days, None] - flush).clip(min=0)
+        # Same operation order as compute_harvest
+        inflow = (
+            excess[:, :, None]
+            * roof * classrooms
+            * runoff * gutter
+        )
+        total += inflow.sum(axis=0)
+        storage, short = simulate_tanks(
+            inflow[:, :, :, None], tank_sizes, daily_demand_L, storage=storage
+        )
+        shortage += short
+
+    n = len(rain)
+    years = synth["synthetic_year"].nunique()
+    n_variants = len(flush) * len(roof)
+    n_tanks = len(tank_sizes)
+
+    def per_row(values):
+        return np.repeat(np.asarray(values), n_tanks)
+
+    return pd.DataFrame({
+        "roof_area": per_row(np.tile(roof, len(flush))),
+        "runoff_coeff": per_row(np.tile(runoff, len(flush))),
+        "gutter_eff": per_row(np.tile(gutter, len(flush))),
+        "first_flush": per_row(np.repeat(flush, len(roof))),
+        "annual_L": per_row(total.ravel() / years),
+        "tank_L": tank_sizes * n_variants,
+        "reliability_pct": [round(100 * (1 - s / n), 2) for s in shortage.ravel().tolist()],
+    })
+
+
+def tornado_table(grid, tank_L=None, metric="reliability_pct", baseline=None):
+    """
+    One-at-a-time sensitivity of ``metric`` from a sensitivity_grid table.
+
+    Each parameter is moved from its lowest to its highest grid value while
+    the others stay at ``baseline`` (default: the median grid value of each
+    parameter). Rows are sorted by swing, largest first.
+
+    Parameters
+    ----------
+    grid : pandas.DataFrame
+        Output of sensitivity_grid
+    tank_L : int, optional
+        Tank size to read reliability at; required for "reliability_pct"
+    metric : str
+        "reliability_pct" or "annual_L"
+    baseline : dict, optional
+        Baseline value per parameter; must be grid values
+    """
+    if metric == "reliability_pct":
+        if tank_L is None:
+            raise ValueError("tank_L is required for the reliability tornado.")
+        grid = grid[grid["tank_L"] == tank_L]
+        if grid.empty:
+            raise ValueError(f"Tank size {tank_L} is not in the grid.")
+    else:
+        grid = grid.drop_duplicates(list(PARAMETERS))
+
+    values = {p: np.sort(grid[p].unique()) for p in PARAMETERS}
+    baseline = {**{p: values[p][(len(values[p]) - 1) // 2] for p in PARAMETERS}, **(baseline or {})}
+
+    at_baseline = np.ones(len(grid), dtype=bool)
+    for p in PARAMETERS:
+        at_baseline &= grid[p].to_numpy() == baseline[p]
+    if not at_baseline.any():
+        raise ValueError(f"Baseline {baseline} is not a grid point.")
+    base_value = grid.loc[at_baseline, metric].iloc[0]
+
+    rows = []
+    for p in PARAMETERS:
+        others = np.ones(len(grid), dtype=bool)
+        for q in PARAMETERS:
+            if q != p:
+                others &= grid[q].to_numpy() == baseline[q]
+        line = grid[others].set_index(p)[metric]
+        low, high = values[p][0], values[p][-1]
+        rows.append({
+            "parameter": p,
+            "low": low,
+            "high": high,
+            "baseline": baseline[p],
+            f"{metric}_low": line[low],
+            f"{metric}_baseline": base_value,
+            f"{metric}_high": line[high],
+            "swing": abs(line[high] - line[low]),
+        })
+
+    return pd.DataFrame(rows).sort_values("swing", ascending=False, kind="stable").reset_index(drop=True)
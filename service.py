@@ -0,0 +1,226 @@
+"""
+Local HTTP/JSON service for the rainwater harvesting pipeline.
+
+    python service.py --port 8000 --workers 4
+    curl --data-binary @rainfall.csv \\
+        "http://127.0.0.1:8000/analyze?roof_area=63&classrooms=4&students=40&demand=5"
+
+POST /analyze takes the raw rainfall CSV as the request body and the
+school parameters (positive, finite numbers) in the query string. The
+response is streamed as newline-delimited JSON: an "accepted" line right
+away, then "metadata", "harvest_summary" and "tank_reliability" lines
+once the run finishes. Identical concurrent requests (same CSV bytes and parameters) share one
+run. GET /health reports the number of runs in flight.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from load_and_clean import load_and_clean
+from pipeline_runner import PipelineRunner, run_pipeline
+from export_results import build_results_payload
+from stage_cache import data_hash
+
+PARAMS = {
+    "roof_area": (float, 63.0),
+    "classrooms": (int, 4),
+    "students": (int, 40),
+    "demand": (float, 5.0),
+}
+MAX_BODY_BYTES = 256 * 2**20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large"}
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+def parse_params(query):
+    values = dict(parse_qsl(query))
+    params = {}
+    for name, (kind, default) in PARAMS.items():
+        try:
+            params[name] = kind(values.get(name, default))
+        except ValueError:
+            raise ValueError(f"Invalid value for {name}: {values[name]!r}")
+        if not (math.isfinite(params[name]) and params[name] > 0):
+            raise ValueError(f"{name} must be positive and finite: {values[name]!r}")
+    return params
+
+
+def analyze(csv_bytes, params):
+    """Run the full pipeline in a worker process; returns the results payload."""
+    runner = PipelineRunner()
+    raw_df = runner.stage("load_and_clean", load_and_clean, io.BytesIO(csv_bytes))
+    result = run_pipeline(
+        raw_df,
+        roof_area=params["roof_area"],
+        classrooms=params["classrooms"],
+        students=params["students"],
+        demand=params["demand"],
+        runner=runner,
+    )
+
+    metadata = {
+        "roof_area_per_class_m2": params["roof_area"],
+        "number_of_classrooms": params["classrooms"],
+        "students_per_class": params["students"],
+        "demand_L_per_student_per_day": params["demand"],
+        "simulation_years": int(result["harvest_df"]["synthetic_year"].nunique()),
+    }
+    payload = build_results_payload(metadata, result["harvest"], result["table"])
+    payload["stage_metrics"] = runner.metrics
+    return payload
+
+
+class PipelineService:
+    def __init__(self, workers=None):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.in_flight = {}
+
+    def submit(self, csv_bytes, params):
+        """Return ``(key, future, coalesced)``, joining an identical run if one is in flight."""
+        key = data_hash(csv_bytes, params)
+        if key in self.in_flight:
+            return key, self.in_flight[key], True
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, analyze, csv_bytes, params)
+        self.in_flight[key] = future
+        future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return key, future, False
+
+    async def handle(self, reader, writer):
+        try:
+            await self.respond(reader, writer)
+        except ConnectionError:
+            # Client went away (reset or broken pipe); nothing left to send
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, reader, writer):
+        try:
+            method, target, headers, body = await read_request(reader)
+        except PayloadTooLarge as e:
+            await send_json(writer, 413, {"error": str(e)})
+            return
+        except ValueError as e:
+            await send_json(writer, 400, {"error": str(e)})
+            return
+        except asyncio.LimitOverrunError:
+            await send_json(writer, 400, {"error": "Request line or header too long."})
+            return
+        except asyncio.IncompleteReadError:
+            return
+
+        url = urlsplit(target)
+        if method == "GET" and url.path == "/health":
+            await send_json(writer, 200, {"status": "ok", "in_flight": len(self.in_flight)})
+        elif method == "POST" and url.path == "/analyze":
+            try:
+                params = parse_params(url.query)
+            except ValueError as e:
+                await send_json(writer, 400, {"error": str(e)})
+                return
+            if not body:
+                await send_json(writer, 400, {"error": "Request body must be the rainfall CSV."})
+                return
+            await self.stream_analysis(writer, body, params)
+        else:
+            await send_json(writer, 404, {"error": f"No route for {method} {url.path}"})
+
+    async def stream_analysis(self, writer, csv_bytes, params):
+        key, future, coalesced = self.submit(csv_bytes, params)
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        await write_line(writer, {"status": "accepted", "key": key, "coalesced": coalesced})
+
+        try:
+            # shield: one client disconnecting must not cancel a shared run
+            payload = await asyncio.shield(future)
+        except Exception as e:
+            await write_line(writer, {"status": "error", "error": str(e)})
+        else:
+            for section in ("metadata", "harvest_summary", "tank_reliability", "stage_metrics"):
+                await write_line(writer, {section: payload[section]})
+            await write_line(writer, {"status": "done", "generated_at": payload["generated_at"]})
+
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+async def read_request(reader):
+    request_line = (await reader.readuntil(b"\r\n")).decode("latin-1").strip()
+    try:
+        method, target, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise ValueError("Malformed request line.")
+
+    headers = {}
+    while True:
+        line = (await reader.readuntil(b"\r\n")).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise PayloadTooLarge(f"Request body exceeds {MAX_BODY_BYTES // 2**20} MiB.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+async def write_line(writer, obj):
+    data = (json.dumps(obj) + "\n").encode()
+    writer.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+    await writer.drain()
+
+
+async def send_json(writer, status, obj):
+    data = json.dumps(obj).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: close\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+
+
+async def serve(host, port, workers):
+    service = PipelineService(workers)
+    server = await asyncio.start_server(service.handle, host, port, limit=2**20)
+    print(f"Serving on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rainwater harvesting pipeline HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="pipeline worker processes")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+def extract_spell_runs(df):
+    """
+    Run-length encode the wet/dry state column into spells.
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        "state", "length" and "month" (month of the first day) per spell
+    """
+    state = df["state"]
+    month = np.asarray(df["month"])
+
+    if len(state) == 0:
+        raise ValueError("No rainfall records to extract spells from.")
+
+    # Compare integer codes rather than "W"/"D" strings where possible
+    if isinstance(state.dtype, pd.CategoricalDtype):
+        labels = state.cat.categories.to_numpy()
+        codes = state.cat.codes.to_numpy()
+    else:
+        labels = None
+        codes = np.asarray(state)
+
+    starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    lengths = np.diff(np.append(starts, len(codes)))
+
+    return {
+        "state": codes[starts] if labels is None else labels[codes[starts]],
+        "length": lengths,
+        "month": month[starts],
+    }
+
+
+def spells_to_records(runs):
+    return [
+        {"state": s, "length": n, "month": m}
+        for s, n, m in zip(runs["state"], runs["length"].tolist(), runs["month"])
+    ]
+
+
 def extract_spells(df):
-    spells = []
-    current = df.loc[0, "state"]
-    length = 1
-    month = df.loc[0, "month"]
-
-    for i in range(1, len(df)):
-        if df.loc[i, "state"] == current:
-            length += 1
-        else:
-            spells.append({"state": current, "length": length, "month": month})
-            current = df.loc[i, "state"]
-            length = 1
-            month = df.loc[i, "month"]
-
-    spells.append({"state": current, "length": length, "month": month})
-    return spells
+    return spells_to_records(extract_spell_runs(df))
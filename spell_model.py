@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+
+from synthetic_rainfall_generator import DAYS_PER_YEAR, day_months
+
+STATES = ("D", "W")
+
+
+def _as_columns(spells):
+    # Accept extract_spell_runs output or the list of dicts from extract_spells
+    if isinstance(spells, dict):
+        state, length, month = spells["state"], spells["length"], spells["month"]
+    else:
+        state = [s["state"] for s in spells]
+        length = [s["length"] for s in spells]
+        month = [s["month"] for s in spells]
+    wet = (np.asarray(state) == "W").astype(np.int64)
+    return wet, np.asarray(length, dtype=np.int64), np.asarray(month, dtype=np.int64)
+
+
+class SpellModel:
+    """
+    Per-month wet/dry spell model fitted from historical spells.
+
+    Holds, for each calendar month, the share of days spent in wet spells
+    and the empirical distribution of wet and dry spell lengths as
+    cumulative probabilities. Generation is an alternating renewal
+    process: a spell always ends in the other state, so synthetic years
+    alternate wet and dry spells. The first spell of a year is wet with
+    probability equal to January's wet share.
+    Each spell length is drawn by inverse-CDF lookup in the distribution
+    for its state and start month; the monthly wet-day fraction follows
+    from those lengths.
+    """
+
+    def __init__(self, wet_fraction, length_cdf):
+        self.wet_fraction = np.asarray(wet_fraction, dtype=float)
+        # Shape (2, 12, max_length): state (0 dry, 1 wet), month, length - 1
+        self.length_cdf = np.asarray(length_cdf, dtype=float)
+
+    @classmethod
+    def fit(cls, spells):
+        wet, length, month = _as_columns(spells)
+        if len(length) == 0:
+            raise ValueError("No spells to fit.")
+
+        max_length = int(length.max())
+        counts = np.zeros((2, 12, max_length))
+        np.add.at(counts, (wet, month - 1, length - 1), 1)
+
+        # Months without spells of a state fall back to all months pooled
+        for s, label in enumerate(STATES):
+            pooled = counts[s].sum(axis=0)
+            if pooled.sum() == 0:
+                raise ValueError(f"No {label} spells to fit.")
+            empty = counts[s].sum(axis=1) == 0
+            counts[s, empty] = pooled
+
+        cdf = np.cumsum(counts, axis=2)
+        cdf /= cdf[:, :, -1:]
+
+        # Days of each state, by the month its spell started in
+        days = np.zeros((2, 12))
+        np.add.at(days, (wet, month - 1), length)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            wet_fraction = np.nan_to_num(days[1] / days.sum(axis=0), nan=0.5)
+
+        return cls(wet_fraction, cdf)
+
+    def sample_spells(self, n_years, rng):
+        """
+        Draw spell states and lengths for ``n_years`` synthetic years.
+
+        Returns ``(wet, lengths)``, both shaped (n_years, n_spells). The
+        spells of every year cover at least 365 days. Spells drawn after a
+        year is full have length 0.
+        """
+        months = day_months()[1] - 1
+        day = np.zeros(n_years, dtype=np.int64)
+        state = rng.random(n_years) < self.wet_fraction[0]
+
+        states, lengths = [], []
+        while (day < DAYS_PER_YEAR).any():
+            m = months[np.minimum(day, DAYS_PER_YEAR - 1)]
+            cdf = self.length_cdf[state.astype(np.int64), m]
+            u = rng.random(n_years)
+            length = (u[:, None] >= cdf).sum(axis=1) + 1
+            length[day >= DAYS_PER_YEAR] = 0
+
+            states.append(state)
+            lengths.append(length)
+            day += length
+            state = ~state
+
+        return np.column_stack(states), np.column_stack(lengths)
+
+    def to_dict(self):
+        return {
+            "wet_fraction": self.wet_fraction.tolist(),
+            "length_cdf": self.length_cdf.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["wet_fraction"], data["length_cdf"])
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _number(value):
+    # Integral floats hash as ints; NaN and infinities stay floats
+    value = value.item() if isinstance(value, np.generic) else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def data_hash(*parts):
+    """
+    Content hash of rainfall data and/or stage parameters.
+
+    Accepts raw bytes, DataFrames, NumPy arrays and plain Python values
+    (numbers, strings, lists, dicts, ranges); the result is a hex digest
+    that is stable across processes. Numbers hash by value, so 4, 4.0 and
+    np.int64(4) give the same key; booleans stay distinct from 0 and 1.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            h.update(b"bytes")
+            h.update(part)
+        elif isinstance(part, pd.DataFrame):
+            h.update(b"frame")
+            h.update(repr(list(part.columns)).encode())
+            h.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+        elif isinstance(part, np.ndarray):
+            h.update(b"array")
+            h.update(f"{part.dtype}{part.shape}".encode())
+            h.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, range):
+            h.update(f"range{part.start},{part.stop},{part.step}".encode())
+        elif isinstance(part, dict):
+            h.update(b"dict")
+            h.update(data_hash(*sorted((repr(k), data_hash(v)) for k, v in part.items())).encode())
+        elif isinstance(part, (list, tuple)):
+            h.update(b"seq")
+            h.update(data_hash(*part).encode())
+        elif isinstance(part, (bool, np.bool_)):
+            h.update(repr(bool(part)).encode())
+        elif isinstance(part, (int, float, np.integer, np.floating)):
+            h.update(repr(_number(part)).encode())
+        else:
+            h.update(repr(part).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+class StageCache:
+    """
+    Memoizes pipeline stages by content hash.
+
+    Results are kept in an in-memory LRU of ``max_entries`` items and, when
+    ``cache_dir`` is given, also pickled to disk so they survive restarts.
+    Stage keys are chained: each stage is keyed by its parent stage's key
+    plus its own parameters, so a parameter change only invalidates the
+    stages downstream of it.
+
+    The disk cache is read back with pickle, which can run arbitrary code:
+    ``cache_dir`` (MCS_CACHE_DIR in the Streamlit app) must be a directory
+    only trusted users can write to.
+    """
+
+    def __init__(self, max_entries=32, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+
+        if self.cache_dir and self._disk_path(key).exists():
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        self._remember(key, value)
+
+        if self.cache_dir:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._disk_path(key))
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stage(self, name, parent_key, params, compute):
+        """
+        Return ``(key, value)`` for a stage, running ``compute()`` on a miss.
+        """
+        key = data_hash(name, parent_key, params)
+        found, value = self.get(key)
+        if not found:
+            value = compute()
+            self.put(key, value)
+        return key, value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
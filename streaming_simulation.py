@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from synthetic_rainfall_generator import DAYS_PER_YEAR, generate_synthetic
+
+
+class StreamingTankSimulation:
+    """
+    Tank simulation fed one inflow chunk at a time, with bounded memory.
+
+    Applies the same daily rule as simulate_tanks to every tank size and
+    carries storage between ``update()`` calls. Alongside the shortage days
+    it accumulates supplied volume, spill, the longest run of
+    shortage days and a fixed histogram of end-of-day storage (as a fraction
+    of capacity), so memory is O(tanks x storage_bins) however many days
+    are streamed through it.
+    """
+
+    def __init__(self, tank_sizes, daily_demand_L, storage_bins=100, storage=None):
+        self.tank_sizes = list(tank_sizes)
+        self.tanks = np.asarray(self.tank_sizes, dtype=float)
+        self.daily_demand_L = daily_demand_L
+        self.storage_bins = storage_bins
+        n = len(self.tank_sizes)
+
+        self.storage = self.tanks.copy() if storage is None else np.array(storage, dtype=float)
+        self.shortage = np.zeros(n, dtype=np.int64)
+        self.supplied = np.zeros(n)
+        self.spill = np.zeros(n)
+        self.run = np.zeros(n, dtype=np.int64)
+        self.longest_run = np.zeros(n, dtype=np.int64)
+        self.histogram = np.zeros((n, storage_bins), dtype=np.int64)
+        # Empty tanks are common enough to keep apart from the lowest bin
+        self.empty = np.zeros(n, dtype=np.int64)
+        self.n_days = 0
+
+    def update(self, inflow):
+        """Simulate the next days of daily harvest (L); returns the number of days."""
+        inflow = np.asarray(inflow, dtype=float)
+        tanks, demand = self.tanks, float(self.daily_demand_L)
+        storage = self.storage
+        n = len(tanks)
+
+        excess = np.empty(n)
+        short = np.empty(n, dtype=bool)
+        drawn = np.empty(n)
+        bins = np.empty(n, dtype=np.int64)
+        hist = self.histogram.ravel()
+        offsets = np.arange(n) * self.storage_bins
+        # Storage is a fraction of capacity in [0, 1]; the full tank goes in the last bin
+        to_bin = self.storage_bins / np.where(tanks > 0, tanks, 1.0)
+
+        for daily_in in inflow:
+            np.add(storage, daily_in, out=storage)
+            np.subtract(storage, tanks, out=excess)
+            np.maximum(excess, 0.0, out=excess)
+            self.spill += excess
+            np.minimum(storage, tanks, out=storage)
+
+            # Same order as simulate_tanks, so shortage counts match exactly
+            np.less(storage, demand, out=short)
+            self.shortage += short
+            np.minimum(storage, demand, out=drawn)
+            self.supplied += drawn
+            np.subtract(storage, demand, out=storage)
+            np.maximum(storage, 0.0, out=storage)
+            self.empty += storage == 0.0
+
+            self.run += 1
+            self.run *= short
+            np.maximum(self.longest_run, self.run, out=self.longest_run)
+
+            np.multiply(storage, to_bin, out=drawn)
+            np.floor(drawn, out=drawn)
+            np.minimum(drawn, self.storage_bins - 1, out=drawn)
+            bins[:] = drawn
+            hist[offsets + bins] += 1
+
+        self.n_days += len(inflow)
+        return len(inflow)
+
+    def storage_percentile(self, q):
+        """End-of-day storage (L) per tank at percentile ``q``, read from the histogram."""
+        cumulative = np.cumsum(self.histogram, axis=1)
+        target = q / 100 * self.n_days
+        first = (cumulative < target).sum(axis=1).clip(max=self.storage_bins - 1)
+        rows = np.arange(len(self.tanks))
+        below = np.where(first > 0, cumulative[rows, np.maximum(first - 1, 0)], self.empty)
+        in_bin = self.histogram[rows, first] - np.where(first > 0, 0, self.empty)
+        # Linear interpolation within the bin; empty days sit at exactly 0 L
+        within = np.divide(target - below, in_bin, out=np.zeros(len(rows)), where=in_bin > 0)
+        return (first + within.clip(0, 1)) / self.storage_bins * self.tanks
+
+    def reliability_table(self, percentiles=(5, 50, 95)):
+        """
+        One row per tank: reliability_pct (days, as build_reliability_table),
+        volumetric_reliability_pct, spill_L_per_year, longest_shortage_days and
+        storage_p{q}_L for each percentile.
+        """
+        if self.n_days == 0:
+            raise ValueError("No harvest data available.")
+
+        demand_total = float(self.daily_demand_L) * self.n_days
+        volumetric = self.supplied / demand_total if demand_total > 0 else np.ones(len(self.tanks))
+        table = pd.DataFrame({
+            "tank_L": self.tank_sizes,
+            "reliability_pct": [round(100 * (1 - s / self.n_days), 2) for s in self.shortage.tolist()],
+            "volumetric_reliability_pct": (100 * volumetric).round(2),
+            "spill_L_per_year": (self.spill / self.n_days * DAYS_PER_YEAR).round(2),
+            "longest_shortage_days": self.longest_run,
+        })
+        for q in percentiles:
+            table[f"storage_p{q}_L"] = self.storage_percentile(q).round(1)
+        return table
+
+
+def simulate_stream(chunks, tank_sizes, daily_demand_L, storage_bins=100, percentiles=(5, 50, 95)):
+    """
+    Stream inflow chunks through a StreamingTankSimulation; returns its table.
+
+    ``chunks`` is any iterable of 1-D daily harvest arrays (L): slices of a
+    memory-mapped column, ``synthetic_harvest_chunks(...)``, or e.g.
+    ``(c["harvest_L"] for _, c in store.iter_chunks(["harvest_L"]))`` for an
+    EnsembleStore.
+    """
+    sim = StreamingTankSimulation(tank_sizes, daily_demand_L, storage_bins)
+    for chunk in chunks:
+        sim.update(chunk)
+    return sim.reliability_table(percentiles)
+
+
+def synthetic_harvest_chunks(
+    intensity,
+    n_years,
+    roof_area,
+    classrooms,
+    runoff_coeff=0.9,
+    gutter_eff=0.95,
+    first_flush=2.0,
+    years_per_chunk=100,
+    seed=2025,
+    model=None,
+):
+    """
+    Daily harvest (L) of ``n_years`` synthetic years, ``years_per_chunk`` at a time.
+
+    Rainfall comes straight from the vectorized generator and is dropped
+    after each chunk; one generator stream spans the chunks, as in
+    EnsembleStore.write_synthetic.
+    """
+    rng = np.random.default_rng(seed)
+    for first in range(0, n_years, years_per_chunk):
+        synth = generate_synthetic(
+            None, intensity, min(years_per_chunk, n_years - first), seed=rng, vectorized=True, model=model
+        )
+        yield (
+            (synth["rain_mm"].to_numpy() - first_flush).clip(min=0)
+            * roof_area * classrooms
+            * runoff_coeff * gutter_eff
+        )
@@ -1,22 +1,100 @@
 import numpy as np
 import pandas as pd
 
-def generate_synthetic(spells, intensity, n_years=1, seed=2025):
+from rainfall_statistics import index_to_stats
+
+DAYS_PER_YEAR = 365
+WET_PROB = 0.4
+MAX_SPELL_DAYS = 5
+
+
+def day_months():
+    """Day of year (1-365) and the 30-day month (1-12) the generator assigns to it."""
+    day = np.arange(1, DAYS_PER_YEAR + 1)
+    return day, np.minimum(((day - 1) // 30) + 1, 12)
+
+
+def _monthly_scale(intensity):
+    # Gamma scale per month (index 1-12); NaN where the month has no wet days.
+    if isinstance(intensity, np.ndarray):
+        if intensity.shape[0] != 13:
+            raise ValueError("Synthetic generation needs a monthly intensity index.")
+        return np.maximum(intensity[:, 0], 0.1) / 2
+    scale = np.full(13, np.nan)
+    for m, params in intensity.items():
+        scale[m] = max(params["mean"], 0.1) / 2
+    return scale
+
+
+def _spells_to_days(wet_spell, lengths):
+    # Offsetting each year's spell ends keeps the flattened array sorted so a
+    # single searchsorted resolves every day of every year onto its spell.
+    n_years = len(lengths)
+    ends = np.cumsum(lengths, axis=1)
+    stride = int(ends[:, -1].max())
+    offsets = np.arange(n_years)[:, None] * stride
+    days = (np.arange(DAYS_PER_YEAR)[None, :] + offsets).ravel()
+    return wet_spell.ravel()[np.searchsorted((ends + offsets).ravel(), days, side="right")]
+
+
+def _generate_vectorized(intensity, n_years, rng, model=None):
+    if model is not None:
+        wet_spell, lengths = model.sample_spells(n_years, rng)
+    else:
+        # Every year has at most 365 spells, so draw that many per year up front
+        wet_spell = rng.random((n_years, DAYS_PER_YEAR)) < WET_PROB
+        lengths = rng.integers(1, MAX_SPELL_DAYS + 1, size=(n_years, DAYS_PER_YEAR))
+    wet = _spells_to_days(wet_spell, lengths)
+
+    day, month = day_months()
+    month = np.tile(month, n_years)
+    scale = _monthly_scale(intensity)[month]
+
+    rain = np.zeros(n_years * DAYS_PER_YEAR)
+    draw = wet & ~np.isnan(scale)
+    rain[draw] = rng.gamma(shape=2.0, scale=scale[draw])
+
+    return pd.DataFrame({
+        "synthetic_year": np.repeat(np.arange(1, n_years + 1), DAYS_PER_YEAR),
+        "day_of_year": np.tile(day, n_years),
+        "month": month,
+        "rain_mm": rain,
+        "wet": wet.astype(np.int64),
+    })
+
+
+def generate_synthetic(spells, intensity, n_years=1, seed=2025, vectorized=False, model=None):
+    """
+    Generate daily synthetic rainfall for ``n_years`` 365-day years.
+
+    By default wet and dry spells are drawn with a fixed 40% wet chance and
+    1-5 day lengths. Passing a fitted spell_model.SpellModel as ``model``
+    draws them from the historical spell statistics instead (always
+    vectorized). ``vectorized=True`` draws all years as bulk arrays.
+    ``intensity`` is the rainfall_intensity_stats dict or a monthly
+    rainfall_statistics.intensity_index array.
+    """
     rng = np.random.default_rng(seed)
     records = []
 
-    if not intensity:
+    if intensity is None or len(intensity) == 0:
         raise ValueError("Rainfall intensity parameters missing.")
 
+    if vectorized or model is not None:
+        return _generate_vectorized(intensity, n_years, rng, model=model)
+
+    if isinstance(intensity, np.ndarray):
+        intensity = index_to_stats(intensity)
+
     for y in range(n_years):
         day = 1
-        while day <= 365:
+        while day <= DAYS_PER_YEAR:
             month = min(((day - 1) // 30) + 1, 12)
-            wet = rng.random() < 0.4
-            length = rng.integers(1, 6)
+            wet = rng.random() < WET_PROB
+            length = rng.integers(1, MAX_SPELL_DAYS + 1)
 
             for _ in range(length):
-                if day > 365:
+                if day > DAYS_PER_YEAR:
                     break
                 rain = 0.0
                 if wet and month in intensity:
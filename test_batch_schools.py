@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from batch_schools import evaluate_schools
+from harvest_summary import compute_harvest, summarize_harvest
+from reference_table_builder import build_reliability_table
+
+TANK_SIZES = range(500, 20001, 500)
+
+
+def assert_summary_close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            assert list(actual[key]) == list(value), key
+            np.testing.assert_allclose(list(actual[key].values()), list(value.values()), rtol=1e-12)
+        else:
+            np.testing.assert_allclose(actual[key], value, rtol=1e-12)
+
+
+def synthetic_frame(seed=2025, years=5):
+    rng = np.random.default_rng(seed)
+    day = np.tile(np.arange(1, 366), years)
+    return pd.DataFrame({
+        "synthetic_year": np.repeat(np.arange(1, years + 1), 365),
+        "day_of_year": day,
+        "month": np.minimum((day - 1) // 30 + 1, 12),
+        "rain_mm": np.where(rng.random(years * 365) < 0.35, rng.gamma(0.8, 12.0, years * 365), 0.0),
+    })
+
+
+def test_matches_one_school_at_a_time():
+    synth = synthetic_frame()
+    schools = pd.DataFrame({
+        "school": ["a", "b", "c"],
+        "roof_area": [63.0, 40.0, 90.5],
+        "classrooms": [4, 6, 2],
+        "students": [40, 35, 50],
+        "demand": [5.0, 3.0, 7.5],
+    })
+    result = evaluate_schools(synth, schools, TANK_SIZES, chunk_days=400)
+
+    for i, row in enumerate(schools.itertuples(index=False)):
+        harvest_df = compute_harvest(synth, row.roof_area, row.classrooms, 0.9, 0.95, 2.0)
+        expected = build_reliability_table(harvest_df, TANK_SIZES, row.classrooms * row.students * row.demand)
+        table = result["reliability"]
+        table = table.loc[table["school"] == row.school, ["tank_L", "reliability_pct"]]
+        pd.testing.assert_frame_equal(table.reset_index(drop=True), expected)
+        assert_summary_close(result["harvest_summaries"][i], summarize_harvest(harvest_df))
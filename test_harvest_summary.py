@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from harvest_summary import compute_harvest, summarize_harvest
+
+
+def original_summarize_harvest(df):
+    # The groupby version the bincount summary replaced
+    years = df["synthetic_year"].nunique()
+    summary = {
+        "annual_L": df["harvest_L"].sum() / years,
+        "annual_L_per_class": df["harvest_L_per_class"].sum() / years,
+        "monthly_L": (df.groupby("month")["harvest_L"].sum() / years).to_dict(),
+        "monthly_L_per_class": (df.groupby("month")["harvest_L_per_class"].sum() / years).to_dict(),
+    }
+    week = ((df["day_of_year"] - 1) // 7) + 1
+    summary["weekly_L"] = (df.groupby(week)["harvest_L"].sum() / years).to_dict()
+    summary["weekly_L_per_class"] = (df.groupby(week)["harvest_L_per_class"].sum() / years).to_dict()
+    return summary
+
+
+def harvest_frame(seed=2025, years=5):
+    rng = np.random.default_rng(seed)
+    day = np.tile(np.arange(1, 366), years)
+    synth = pd.DataFrame({
+        "synthetic_year": np.repeat(np.arange(1, years + 1), 365),
+        "day_of_year": day,
+        "month": np.minimum((day - 1) // 30 + 1, 12),
+        "rain_mm": np.where(rng.random(years * 365) < 0.35, rng.gamma(0.8, 12.0, years * 365), 0.0),
+    })
+    return compute_harvest(synth, 63.0, 4, 0.9, 0.95, 2.0)
+
+
+def test_matches_original_groupby():
+    df = harvest_frame()
+    summary = summarize_harvest(df)
+    expected = original_summarize_harvest(df)
+
+    assert summary.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            assert list(summary[key]) == list(value), key
+            np.testing.assert_allclose(list(summary[key].values()), list(value.values()), rtol=1e-12)
+        else:
+            np.testing.assert_allclose(summary[key], value, rtol=1e-12)
+
+
+def test_per_year_totals():
+    df = harvest_frame(years=3)
+    summary = summarize_harvest(df, per_year=True)
+    expected = df.groupby("synthetic_year")[["harvest_L", "harvest_L_per_class"]].sum()
+    assert list(summary["annual_L_by_year"]) == [1, 2, 3]
+    np.testing.assert_allclose(list(summary["annual_L_by_year"].values()), expected["harvest_L"], rtol=1e-12)
+    np.testing.assert_allclose(
+        list(summary["annual_L_per_class_by_year"].values()), expected["harvest_L_per_class"], rtol=1e-12
+    )
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from harvest_summary import compute_harvest, summarize_harvest
+from incremental_reliability import ReliabilityState
+from reference_table_builder import build_reliability_table
+
+TANK_SIZES = range(500, 20001, 500)
+
+
+def gauge_frame(seed=2025, years=4):
+    # load_and_clean-shaped record over calendar dates, leap day included
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2020-01-01", f"{2020 + years - 1}-12-31", freq="D")
+    rain = np.where(rng.random(len(dates)) < 0.35, rng.gamma(0.8, 12.0, len(dates)), 0.0)
+    return pd.DataFrame({"date": dates, "month": dates.month, "rainfall": rain})
+
+
+def full_run(df):
+    harvest_df = compute_harvest(
+        pd.DataFrame({
+            "synthetic_year": df["date"].dt.year,
+            "day_of_year": df["date"].dt.dayofyear,
+            "month": df["month"],
+            "rain_mm": df["rainfall"],
+        }),
+        63.0, 4, 0.9, 0.95, 2.0,
+    )
+    return build_reliability_table(harvest_df, TANK_SIZES, 800.0), summarize_harvest(harvest_df)
+
+
+def test_chunked_updates_match_full_run(tmp_path):
+    df = gauge_frame()
+    state = ReliabilityState(TANK_SIZES, 800.0, 63.0, 4)
+    used = state.update(df.iloc[:400])
+    state.save(tmp_path / "state.json")
+
+    state = ReliabilityState.load(tmp_path / "state.json")
+    # Overlapping feed: days already processed are skipped
+    used += state.update(df.iloc[300:1000])
+    used += state.update(df.iloc[1000:])
+    assert used == len(df)
+
+    table, summary = full_run(df)
+    pd.testing.assert_frame_equal(state.reliability_table(), table)
+
+    incremental = state.harvest_summary()
+    assert incremental.keys() == summary.keys()
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            assert list(incremental[key]) == list(value), key
+            np.testing.assert_allclose(list(incremental[key].values()), list(value.values()), rtol=1e-12)
+        else:
+            np.testing.assert_allclose(incremental[key], value, rtol=1e-12)
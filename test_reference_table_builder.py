@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from reference_table_builder import build_reliability_table, iter_reliability_table
+
+TANK_SIZES = range(500, 30001, 500)
+
+
+def original_reliability_table(df, tank_sizes, daily_demand_L):
+    # The per-tank, per-day loop simulate_tanks replaced; results must match it exactly.
+    results = []
+    inflow = df["harvest_L"].values
+    n = len(inflow)
+    for tank in tank_sizes:
+        storage = tank
+        shortage = 0
+        for daily_in in inflow:
+            storage = min(tank, storage + daily_in)
+            if storage >= daily_demand_L:
+                storage -= daily_demand_L
+            else:
+                shortage += 1
+                storage = 0
+        results.append({"tank_L": tank, "reliability_pct": round(100 * (1 - shortage / n), 2)})
+    return pd.DataFrame(results)
+
+
+def harvest_frame(seed=2025, years=50):
+    rng = np.random.default_rng(seed)
+    days = years * 365
+    rain = np.where(rng.random(days) < 0.35, rng.gamma(0.8, 12.0, days), 0.0)
+    harvest = (rain - 2.0).clip(min=0) * 63.0 * 4 * 0.9 * 0.95
+    return pd.DataFrame({"harvest_L": harvest})
+
+
+def test_matches_original_loop():
+    df = harvest_frame()
+    expected = original_reliability_table(df, TANK_SIZES, 800.0)
+    pd.testing.assert_frame_equal(build_reliability_table(df, TANK_SIZES, 800.0), expected)
+
+
+def test_matches_original_loop_when_storage_equals_demand():
+    # Whole-litre inflows make storage == demand common: that day is not a shortage
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({"harvest_L": rng.integers(0, 3, 5000) * 400.0})
+    expected = original_reliability_table(df, range(400, 4001, 400), 400.0)
+    pd.testing.assert_frame_equal(build_reliability_table(df, range(400, 4001, 400), 400.0), expected)
+
+
+def test_chunked_table_matches_original_loop():
+    df = harvest_frame(seed=1, years=10)
+    *_, (days_done, table) = iter_reliability_table(df, TANK_SIZES, 800.0, chunk_days=1000)
+    assert days_done == len(df)
+    pd.testing.assert_frame_equal(table, original_reliability_table(df, TANK_SIZES, 800.0))
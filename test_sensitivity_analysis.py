@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from harvest_summary import compute_harvest
+from reference_table_builder import build_reliability_table
+from sensitivity_analysis import sensitivity_grid, tornado_table
+
+TANK_SIZES = range(500, 20001, 500)
+
+
+def synthetic_frame(seed=2025, years=5):
+    rng = np.random.default_rng(seed)
+    day = np.tile(np.arange(1, 366), years)
+    return pd.DataFrame({
+        "synthetic_year": np.repeat(np.arange(1, years + 1), 365),
+        "day_of_year": day,
+        "month": np.minimum((day - 1) // 30 + 1, 12),
+        "rain_mm": np.where(rng.random(years * 365) < 0.35, rng.gamma(0.8, 12.0, years * 365), 0.0),
+    })
+
+
+def test_grid_matches_one_point_at_a_time():
+    synth = synthetic_frame()
+    grid = sensitivity_grid(synth, (50.0, 63.0), 4, 800.0, TANK_SIZES, chunk_days=400)
+    assert len(grid) == 2 * 3 * 3 * 3 * len(TANK_SIZES)
+
+    for (roof, runoff, gutter, flush), rows in grid.groupby(
+        ["roof_area", "runoff_coeff", "gutter_eff", "first_flush"], sort=False
+    ):
+        harvest_df = compute_harvest(synth, roof, 4, runoff, gutter, flush)
+        expected = build_reliability_table(harvest_df, TANK_SIZES, 800.0)
+        pd.testing.assert_frame_equal(rows[["tank_L", "reliability_pct"]].reset_index(drop=True), expected)
+        np.testing.assert_allclose(rows["annual_L"], harvest_df["harvest_L"].sum() / 5, rtol=1e-12)
+
+
+def test_tornado_swing_matches_grid():
+    grid = sensitivity_grid(synthetic_frame(), (50.0, 63.0, 80.0), 4, 800.0, TANK_SIZES)
+    tornado = tornado_table(grid, metric="annual_L")
+    row = tornado.set_index("parameter").loc["roof_area"]
+    base = grid[(grid["runoff_coeff"] == 0.9) & (grid["gutter_eff"] == 0.95) & (grid["first_flush"] == 2.0)]
+    annual = base.drop_duplicates("roof_area").set_index("roof_area")["annual_L"]
+    assert row["swing"] == abs(annual[80.0] - annual[50.0])
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from rainfall_statistics import rainfall_intensity_stats
+from spell_analysis import extract_spell_runs
+from spell_model import SpellModel
+from synthetic_rainfall_generator import generate_synthetic
+from wet_dry_classification import classify_wet_dry
+
+
+def seasonal_gauge(seed=3, years=30):
+    # Wet-day chance and spell persistence both peak in January
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1990-01-01", periods=years * 365, freq="D")
+    month = dates.month.to_numpy()
+    season = 0.5 + 0.4 * np.cos(2 * np.pi * (month - 1) / 12)
+    u = rng.random(len(dates))
+    wet = np.zeros(len(dates), dtype=bool)
+    for i in range(1, len(dates)):
+        wet[i] = u[i] < (0.4 + 0.4 * season[i] if wet[i - 1] else 0.1 + 0.4 * season[i])
+    rain = np.where(wet, 5.0, 0.0)
+    return classify_wet_dry(pd.DataFrame({"date": dates, "month": month, "rainfall": rain}))
+
+
+def test_fitted_model_reproduces_monthly_wet_fraction():
+    hist = seasonal_gauge()
+    model = SpellModel.fit(extract_spell_runs(hist))
+    synth = generate_synthetic(None, rainfall_intensity_stats(hist), n_years=300, seed=1, model=model)
+
+    hist_pct = 100 * hist.groupby("month")["wet"].mean().to_numpy()
+    synth_pct = 100 * synth.groupby("month")["wet"].mean().to_numpy()
+    np.testing.assert_allclose(synth_pct, hist_pct, atol=3.0)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    model = SpellModel.fit(extract_spell_runs(seasonal_gauge(years=5)))
+    model.save(tmp_path / "model.json")
+    loaded = SpellModel.load(tmp_path / "model.json")
+    np.testing.assert_array_equal(loaded.wet_fraction, model.wet_fraction)
+    np.testing.assert_array_equal(loaded.length_cdf, model.length_cdf)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from reference_table_builder import build_reliability_table
+from streaming_simulation import StreamingTankSimulation, simulate_stream
+
+TANK_SIZES = range(500, 20001, 500)
+
+
+def harvest_series(seed=2025, years=5):
+    rng = np.random.default_rng(seed)
+    days = years * 365
+    rain = np.where(rng.random(days) < 0.35, rng.gamma(0.8, 12.0, days), 0.0)
+    return (rain - 2.0).clip(min=0) * 63.0 * 4 * 0.9 * 0.95
+
+
+def storage_trace(inflow, tank, daily_demand_L):
+    # Plain daily loop: end-of-day storage, supplied volume, spill and
+    # the longest run of shortage days
+    storage, supplied, spill = tank, 0.0, 0.0
+    run = longest = 0
+    trace = []
+    for daily_in in inflow:
+        storage += daily_in
+        spill += max(storage - tank, 0.0)
+        storage = min(tank, storage)
+        run = run + 1 if storage < daily_demand_L else 0
+        longest = max(longest, run)
+        supplied += min(storage, daily_demand_L)
+        storage = max(storage - daily_demand_L, 0.0)
+        trace.append(storage)
+    return np.array(trace), supplied, spill, longest
+
+
+def test_chunked_stream_matches_build_reliability_table():
+    inflow = harvest_series()
+    table = simulate_stream(np.array_split(inflow, 7), TANK_SIZES, 800.0)
+    expected = build_reliability_table(pd.DataFrame({"harvest_L": inflow}), TANK_SIZES, 800.0)
+    pd.testing.assert_series_equal(table["reliability_pct"], expected["reliability_pct"])
+
+
+def test_metrics_match_full_storage_trace():
+    inflow = harvest_series(seed=7)
+    sim = StreamingTankSimulation(TANK_SIZES, 800.0, storage_bins=100)
+    for chunk in np.array_split(inflow, 4):
+        sim.update(chunk)
+    table = sim.reliability_table(percentiles=(5, 50, 95))
+
+    for i, tank in enumerate(TANK_SIZES):
+        trace, supplied, spill, longest = storage_trace(inflow, tank, 800.0)
+        for q in (5, 50, 95):
+            assert abs(sim.storage_percentile(q)[i] - np.percentile(trace, q)) <= tank / 100
+        assert table["volumetric_reliability_pct"][i] == round(100 * supplied / (800.0 * len(inflow)), 2)
+        np.testing.assert_allclose(sim.spill[i], spill, rtol=1e-9)
+        assert table["longest_shortage_days"][i] == longest
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from rainfall_statistics import rainfall_intensity_stats
+from spell_analysis import extract_spell_runs, extract_spells
+from spell_model import SpellModel
+from synthetic_rainfall_generator import generate_synthetic
+from validation_and_summary import MIN_VALIDATION_YEARS, validation_report
+from wet_dry_classification import classify_wet_dry
+
+
+def markov_gauge(seed=0, years=30):
+    # Seasonal two-state Markov chain: wetter and more persistent around January
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1990-01-01", periods=years * 365, freq="D")
+    month = dates.month.to_numpy()
+    season = 0.5 + 0.4 * np.cos(2 * np.pi * (month - 1) / 12)
+    p_wet_after_dry, p_wet_after_wet = 0.1 + 0.4 * season, 0.4 + 0.4 * season
+    u = rng.random(len(dates))
+    wet = np.zeros(len(dates), dtype=bool)
+    for i in range(1, len(dates)):
+        wet[i] = u[i] < (p_wet_after_wet[i] if wet[i - 1] else p_wet_after_dry[i])
+    rain = np.where(wet, rng.gamma(0.8, 4 + 10 * season), 0.0)
+    return classify_wet_dry(pd.DataFrame({"date": dates, "month": month, "rainfall": rain}))
+
+
+def test_fitted_model_passes_its_own_validation():
+    hist = markov_gauge()
+    model = SpellModel.fit(extract_spell_runs(hist))
+    intensity = rainfall_intensity_stats(hist)
+    failed = [
+        seed
+        for seed in range(40)
+        if not validation_report(
+            hist, generate_synthetic(None, intensity, MIN_VALIDATION_YEARS, seed=seed, model=model)
+        )["passed"]
+    ]
+    assert len(failed) <= 1, failed
+
+
+def test_fixed_generator_fails_validation():
+    hist = markov_gauge()
+    synth = generate_synthetic(
+        extract_spells(hist), rainfall_intensity_stats(hist), MIN_VALIDATION_YEARS, vectorized=True
+    )
+    report = validation_report(hist, synth)
+    assert not report["passed"]
+    assert not report["checks"]["wet_pct_z"]["passed"]
@@ -1,3 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from spell_analysis import extract_spell_runs
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Shorter synthetic series are too noisy for the spell-length KS checks
+MIN_VALIDATION_YEARS = 10
+
+# Limits for validation_report's pass flag. The monthly checks are in
+# standard errors, so their limits hold for any series length.
+TOLERANCES = {
+    "monthly_mean_z": 4.0,  # max |monthly mean difference| / its standard error
+    "wet_pct_z": 4.0,  # max |monthly wet-day % difference| / its standard error
+    "ks_wet_amount": 0.25,
+    "ks_wet_spell": 0.25,
+    "ks_dry_spell": 0.25,
+}
+
+
 def validate_model(hist_df, synth_df):
     return {
         "historical_mean_mm": hist_df["rainfall"].mean(),
@@ -5,3 +26,161 @@ def validate_model(hist_df, synth_df):
         "historical_wet_pct": (hist_df["state"] == "W").mean() * 100,
         "synthetic_wet_pct": synth_df["wet"].mean() * 100,
     }
+
+
+def ks_statistic(a, b):
+    """Two-sample Kolmogorov-Smirnov statistic: the largest gap between the empirical CDFs."""
+    a, b = np.sort(np.asarray(a, dtype=float)), np.sort(np.asarray(b, dtype=float))
+    if len(a) == 0 or len(b) == 0:
+        return float("nan")
+    points = np.concatenate((a, b))
+    cdf_a = np.searchsorted(a, points, side="right") / len(a)
+    cdf_b = np.searchsorted(b, points, side="right") / len(b)
+    return float(np.abs(cdf_a - cdf_b).max())
+
+
+def _series_stats(df):
+    # Rain, wet flag and month of a classify_wet_dry (historical) or
+    # generate_synthetic (synthetic) frame, reduced with bincount.
+    rain = df["rainfall" if "rainfall" in df.columns else "rain_mm"].to_numpy(dtype=float)
+    wet = df["wet"].to_numpy(dtype=np.int64)
+    month = df["month"].to_numpy(dtype=np.int64)
+    if len(rain) == 0:
+        raise ValueError("No rainfall records to validate.")
+
+    days = np.bincount(month, minlength=13)[1:]
+    total = np.bincount(month, weights=rain, minlength=13)[1:]
+    squares = np.bincount(month, weights=rain * rain, minlength=13)[1:]
+    wet_days = np.bincount(month, weights=wet, minlength=13)[1:]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / days
+        var = (squares - days * mean * mean) / (days - 1)
+
+    # Lag-1 correlation of the wet flag: P(wet | wet) - P(wet | dry)
+    after_wet = wet[1:][wet[:-1] == 1]
+    after_dry = wet[1:][wet[:-1] == 0]
+    persistence = (
+        (after_wet.mean() if len(after_wet) else 0.0)
+        - (after_dry.mean() if len(after_dry) else 0.0)
+    )
+
+    runs = extract_spell_runs({"state": wet, "month": month})
+    return {
+        "days": days,
+        "persistence": float(persistence),
+        "mean": mean,
+        "var": np.maximum(var, 0.0),
+        "wet_pct": 100 * wet_days / np.maximum(days, 1),
+        "amounts": rain[(wet == 1) & (rain > 0)],
+        "wet_spells": runs["length"][runs["state"] == 1],
+        "dry_spells": runs["length"][runs["state"] == 0],
+    }
+
+
+def _z_scores(diff, variance):
+    # |diff| / standard error; a difference with no variance at all is infinite
+    se = np.sqrt(variance)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(se > 0, np.abs(diff) / se, np.where(diff == 0, 0.0, np.inf))
+
+
+def validation_report(hist_df, synth_df, quantiles=QUANTILES, tolerances=None):
+    """
+    Compare a synthetic series with the historical record it was fitted to.
+
+    The monthly mean and wet-day % differences are divided by their
+    standard error, which shrinks with the number of days each series has
+    in the month. Wet days cluster in spells, so the binomial variance is
+    inflated by (1 + r) / (1 - r), r being the lag-1 correlation of the
+    historical wet flag.
+
+    Parameters
+    ----------
+    hist_df : pandas.DataFrame
+        Historical record from classify_wet_dry
+    synth_df : pandas.DataFrame
+        Synthetic series from generate_synthetic
+    quantiles : sequence of float
+        Wet-day rainfall quantiles to compare
+    tolerances : dict, optional
+        Overrides for TOLERANCES
+
+    Returns
+    -------
+    dict
+        "monthly": per-month days, mean, variance and wet-day % of both
+        series, with the standardized differences mean_z and wet_pct_z;
+        "quantiles": wet-day amount quantiles; "spells": mean wet/dry spell
+        lengths with their KS statistic; "checks": value, limit and result
+        of every check; "passed": True if every check passed
+    """
+    limits = {**TOLERANCES, **(tolerances or {})}
+    hist, synth = _series_stats(hist_df), _series_stats(synth_df)
+
+    monthly = pd.DataFrame({
+        "month": np.arange(1, 13),
+        "hist_days": hist["days"],
+        "synth_days": synth["days"],
+        "hist_mean_mm": hist["mean"],
+        "synth_mean_mm": synth["mean"],
+        "hist_var": hist["var"],
+        "synth_var": synth["var"],
+        "hist_wet_pct": hist["wet_pct"],
+        "synth_wet_pct": synth["wet_pct"],
+    })
+
+    quantile_table = pd.DataFrame({"quantile": list(quantiles)})
+    for name, stats in (("hist", hist), ("synth", synth)):
+        amounts = stats["amounts"]
+        quantile_table[f"{name}_mm"] = (
+            np.quantile(amounts, quantiles) if len(amounts) else np.nan
+        )
+
+    ks = {
+        "ks_wet_amount": ks_statistic(hist["amounts"], synth["amounts"]),
+        "ks_wet_spell": ks_statistic(hist["wet_spells"], synth["wet_spells"]),
+        "ks_dry_spell": ks_statistic(hist["dry_spells"], synth["dry_spells"]),
+    }
+    spells = pd.DataFrame({
+        "state": ["W", "D"],
+        "hist_mean_days": [hist["wet_spells"].mean(), hist["dry_spells"].mean()],
+        "synth_mean_days": [synth["wet_spells"].mean(), synth["dry_spells"].mean()],
+        "ks": [ks["ks_wet_spell"], ks["ks_dry_spell"]],
+    })
+
+    r = min(max(hist["persistence"], 0.0), 0.9)
+    inflation = (1 + r) / (1 - r)
+    n_hist, n_synth = np.maximum(hist["days"], 1), np.maximum(synth["days"], 1)
+    p = hist["wet_pct"] / 100
+    mean_z = _z_scores(
+        synth["mean"] - hist["mean"],
+        inflation * (hist["var"] / n_hist + synth["var"] / n_synth),
+    )
+    wet_pct_z = _z_scores(
+        (synth["wet_pct"] - hist["wet_pct"]) / 100,
+        inflation * p * (1 - p) * (1 / n_hist + 1 / n_synth),
+    )
+    monthly["mean_z"] = mean_z
+    monthly["wet_pct_z"] = wet_pct_z
+
+    # Months missing from either series are left out of the monthly checks
+    both = np.isfinite(hist["mean"]) & np.isfinite(synth["mean"])
+    values = {
+        "monthly_mean_z": float(mean_z[both].max(initial=0.0)),
+        "wet_pct_z": float(wet_pct_z[both].max(initial=0.0)),
+        **ks,
+    }
+    # A NaN statistic (e.g. no wet days at all) fails its check
+    checks = {
+        name: {"value": value, "limit": limits[name], "passed": bool(value <= limits[name])}
+        for name, value in values.items()
+    }
+
+    return {
+        "monthly": monthly,
+        "quantiles": quantile_table,
+        "spells": spells,
+        "checks": checks,
+        "passed": all(c["passed"] for c in checks.values()),
+    }
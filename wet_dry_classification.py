@@ -1,4 +1,68 @@
+import numpy as np
+import pandas as pd
+
+
+def wet_state(rainfall, threshold=0.1):
+    """1 for wet days (rainfall >= threshold), 0 for dry days, as int8."""
+    return np.greater_equal(np.asarray(rainfall, dtype=float), threshold).astype(np.int8)
+
+
 def classify_wet_dry(df, threshold=0.1):
-    df = df.copy()
-    df["state"] = df["rainfall"].apply(lambda r: "W" if r >= threshold else "D")
+    # Shallow copy: the new columns never touch the caller's frame.
+    df = df.copy(deep=False)
+    wet = wet_state(df["rainfall"], threshold)
+    df["wet"] = wet
+    # "W"/"D" kept as a categorical view of the int8 codes for existing callers
+    df["state"] = pd.Categorical.from_codes(wet, categories=["D", "W"])
     return df
+
+
+def classify_thresholds(rainfall, thresholds):
+    """int8 wet/dry states with one row per threshold and one column per day."""
+    rain = np.asarray(rainfall, dtype=float)
+    return np.greater_equal(rain[None, :], np.asarray(thresholds, dtype=float)[:, None]).astype(np.int8)
+
+
+def threshold_sensitivity(df, thresholds):
+    """
+    Wet-day statistics for several wet/dry thresholds at once.
+
+    The rainfall series is sorted once and every threshold is answered by
+    binary search, so the cost barely grows with the number of thresholds.
+
+    Returns
+    -------
+    pandas.DataFrame
+        threshold, wet_days, wet_pct, mean_wet_mm, wet_spells and
+        mean_wet_spell_days per threshold
+    """
+    rain = np.nan_to_num(df["rainfall"].to_numpy(dtype=float), nan=-np.inf)
+    thresholds = np.asarray(thresholds, dtype=float)
+    n = len(rain)
+    if n == 0:
+        raise ValueError("No rainfall records to classify.")
+
+    ordered = np.sort(rain)
+    dry_days = np.searchsorted(ordered, thresholds, side="left")
+    wet_days = n - dry_days
+    totals = np.concatenate(([0.0], np.cumsum(np.where(np.isfinite(ordered), ordered, 0.0)[::-1])))
+    wet_totals = totals[wet_days]
+
+    # A wet spell starts on day i when prev < threshold <= rain[i]; count
+    # those (prev, rain[i]] intervals containing each threshold.
+    prev, cur = np.concatenate(([-np.inf], rain[:-1])), rain
+    rising = prev < cur
+    starts = (
+        np.searchsorted(np.sort(prev[rising]), thresholds, side="left")
+        - np.searchsorted(np.sort(cur[rising]), thresholds, side="left")
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame({
+            "threshold": thresholds,
+            "wet_days": wet_days,
+            "wet_pct": 100 * wet_days / n,
+            "mean_wet_mm": np.where(wet_days > 0, wet_totals / wet_days, np.nan),
+            "wet_spells": starts,
+            "mean_wet_spell_days": np.where(starts > 0, wet_days / starts, np.nan),
+        })